@@ -0,0 +1,74 @@
+"""
+Benchmark DataStore.insert_rows: per-row inserts vs bulk ingestion mode
+
+Run from the project root: `python -m benchmarks.insert_rows_bench`
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from datastore import DataStore
+from twitterapiv2.model.recent.data import Data
+
+PAGE_SIZE = 100
+
+
+def build_page(offset: int) -> List[Data]:
+    """Build a page of synthetic tweets"""
+    return [
+        Data.build_obj(
+            {
+                "id": str(offset + idx),
+                "created_at": "2021-11-14T17:00:00.000Z",
+                "text": f"Synthetic tweet number {offset + idx} #100DaysOfCode",
+            }
+        )
+        for idx in range(PAGE_SIZE)
+    ]
+
+
+def legacy_insert(dbclient: DataStore, tweets: List[Data]) -> None:
+    """Original insert path: one execute per tweet, commit per page"""
+    assert dbclient.db is not None
+    sql = "INSERT OR REPLACE INTO data (id, created_at, content) VALUES (?, ?, ?)"
+    for tweet in tweets:
+        dbclient.db.execute(sql, (tweet.id, tweet.created_at, tweet.text))
+    dbclient.db.commit()
+
+
+def run(total: int, bulk: bool, commit_every: int) -> float:
+    """Returns rows per second for a single run"""
+    pages = [build_page(offset) for offset in range(0, total, PAGE_SIZE)]
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filename = str(Path(tmpdir) / "bench.db")
+        if bulk:
+            datastore = DataStore(filename, commit_every=commit_every, profile="bulk")
+        else:
+            datastore = DataStore(filename)
+        start = time.perf_counter()
+        with datastore.connection() as dbclient:
+            for page in pages:
+                if bulk:
+                    dbclient.insert_rows(page)
+                else:
+                    legacy_insert(dbclient, page)
+        elapsed = time.perf_counter() - start
+    return len(pages) * PAGE_SIZE / elapsed
+
+
+def main() -> None:
+    args = argparse.ArgumentParser(description="insert_rows benchmark")
+    args.add_argument("--tweets", type=int, default=1_000_000)
+    args.add_argument("--commit-every", type=int, default=50)
+    opts = args.parse_args()
+
+    before = run(opts.tweets, bulk=False, commit_every=1)
+    after = run(opts.tweets, bulk=True, commit_every=opts.commit_every)
+    print(f"legacy: {before:,.0f} rows/sec")
+    print(f"bulk:   {after:,.0f} rows/sec ({after / before:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark building Data objects from recorded search/recent payloads
+
+Run from the project root: `python -m benchmarks.model_bench`
+"""
+import argparse
+import copy
+import time
+import tracemalloc
+from typing import Any
+from typing import Dict
+from typing import List
+
+from twitterapiv2.model.recent.data import Data
+
+RECORDED_TWEET: Dict[str, Any] = {
+    "id": "1459535890380902405",
+    "created_at": "2021-11-13T15:04:11.000Z",
+    "text": "Day 42 of #100DaysOfCode learning #Python with @someone https://t.co/abc",
+    "author_id": "2244994945",
+    "conversation_id": "1459535890380902405",
+    "lang": "en",
+    "source": "Twitter Web App",
+    "possibly_sensitive": False,
+    "public_metrics": {
+        "retweet_count": 3,
+        "reply_count": 1,
+        "like_count": 12,
+        "quote_count": 0,
+    },
+    "entities": {
+        "hashtags": [
+            {"start": 10, "end": 25, "tag": "100DaysOfCode"},
+            {"start": 35, "end": 42, "tag": "Python"},
+        ],
+        "mentions": [{"start": 48, "end": 57, "username": "someone"}],
+        "urls": [
+            {
+                "start": 58,
+                "end": 81,
+                "url": "https://t.co/abc",
+                "expanded_url": "https://example.com/post",
+                "display_url": "example.com/post",
+            }
+        ],
+        "annotations": [
+            {
+                "start": 35,
+                "end": 41,
+                "probability": 0.9,
+                "type": "Other",
+                "normalized_text": "Python",
+            }
+        ],
+    },
+    "referenced_tweets": [{"type": "quoted", "id": "1459535502990888960"}],
+}
+
+
+def build_payloads(count: int) -> List[Dict[str, Any]]:
+    """Copies of the recorded tweet with unique ids"""
+    payloads = []
+    for idx in range(count):
+        payload = copy.deepcopy(RECORDED_TWEET)
+        payload["id"] = str(1459535890380902405 - idx)
+        payloads.append(payload)
+    return payloads
+
+
+def main() -> None:
+    args = argparse.ArgumentParser(description="Data.build_obj benchmark")
+    args.add_argument("--tweets", type=int, default=100_000)
+    opts = args.parse_args()
+    payloads = build_payloads(opts.tweets)
+
+    start = time.perf_counter()
+    tweets = [Data.build_obj(payload) for payload in payloads]
+    elapsed = time.perf_counter() - start
+    # collect.py only reads these three fields
+    _ = [(tweet.id, tweet.created_at, tweet.text) for tweet in tweets]
+    del tweets
+
+    tracemalloc.start()
+    tweets = [Data.build_obj(payload) for payload in payloads]
+    size, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"build: {opts.tweets / elapsed:,.0f} tweets/sec")
+    print(f"memory: {size / len(tweets):,.0f} bytes/tweet (excluding payload)")
+
+
+if __name__ == "__main__":
+    main()
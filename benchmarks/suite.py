@@ -0,0 +1,174 @@
+"""
+Micro-benchmark suite for the hot paths, results emitted as JSON
+
+Run from the project root:
+    python -m benchmarks.suite --sizes 1000 10000 100000 --output results.json
+
+Each benchmark runs `--repeat` times on a fresh copy of a seeded synthetic
+corpus and reports the fastest run. Compare two result files to catch
+regressions.
+"""
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Mapping
+
+from benchmarks.synthetic import SyntheticCorpus
+from datastore import DataStore
+from process import CountWords
+from process import create_wordmap
+from twitterapiv2.model.recent.data import Data
+from twitterapiv2.model.recent.recent import Recent
+
+PAGE_SIZE = 100
+
+
+def _best_of(repeat: int, run: Callable[[], None]) -> float:
+    """Fastest wall time of `repeat` calls"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_data_build(tweets: List[Dict[str, Any]]) -> Callable[[], None]:
+    def run() -> None:
+        for tweet in tweets:
+            Data.build_obj(tweet)
+
+    return run
+
+
+def bench_recent_build(pages: List[Dict[str, Any]]) -> Callable[[], None]:
+    def run() -> None:
+        for page in pages:
+            Recent.build_obj(page)
+
+    return run
+
+
+def bench_parse_tweet(texts: List[str], interned: bool = False) -> Callable[[], None]:
+    def run() -> None:
+        counter = CountWords(interned=interned)
+        for text in texts:
+            counter.parse_tweet(text)
+
+    return run
+
+
+def bench_insert_rows(pages: List[List[Data]], tmpdir: Path) -> Callable[[], None]:
+    def run() -> None:
+        filename = tmpdir / "insert.db"
+        filename.unlink(missing_ok=True)
+        with DataStore(str(filename)).connection() as dbclient:
+            for page in pages:
+                dbclient.insert_rows(page)
+
+    return run
+
+
+def bench_iter_text(filename: str) -> Callable[[], None]:
+    def run() -> None:
+        with DataStore(filename, profile="read").connection() as dbclient:
+            for _ in dbclient.iter_text():
+                pass
+
+    return run
+
+
+def bench_get_text(filename: str) -> Callable[[], None]:
+    def run() -> None:
+        with DataStore(filename, profile="read").connection() as dbclient:
+            dbclient.get_text()
+
+    return run
+
+
+def bench_create_wordmap(words: Mapping[str, int], tmpdir: Path) -> Callable[[], None]:
+    def run() -> None:
+        create_wordmap(str(tmpdir / "wordmap.html"), words, 5)
+
+    return run
+
+
+def run_size(size: int, seed: int, repeat: int, tmpdir: Path) -> List[Dict[str, Any]]:
+    """Run every benchmark at one corpus size"""
+    corpus = SyntheticCorpus(seed)
+    pages = [corpus.page(PAGE_SIZE) for _ in range(max(size // PAGE_SIZE, 1))]
+    tweets = [tweet for page in pages for tweet in page["data"]]
+    texts = [tweet["text"] for tweet in tweets]
+    models = [[Data.build_obj(tweet) for tweet in page["data"]] for page in pages]
+
+    database = str(tmpdir / "read.db")
+    with DataStore(database).connection() as dbclient:
+        for page in models:
+            dbclient.insert_rows(page)
+    counter = CountWords()
+    interned = CountWords(interned=True)
+    for text in texts:
+        counter.parse_tweet(text)
+        interned.parse_tweet(text)
+
+    benches: Dict[str, Callable[[], None]] = {
+        "Data.build_obj": bench_data_build(tweets),
+        "Recent.build_obj": bench_recent_build(pages),
+        "CountWords.parse_tweet": bench_parse_tweet(texts),
+        "CountWords.parse_tweet[interned]": bench_parse_tweet(texts, True),
+        "DataStore.insert_rows": bench_insert_rows(models, tmpdir),
+        "DataStore.get_text": bench_get_text(database),
+        "DataStore.iter_text": bench_iter_text(database),
+        "create_wordmap": bench_create_wordmap(dict(counter.word_count), tmpdir),
+        "create_wordmap[interned]": bench_create_wordmap(interned.word_count, tmpdir),
+    }
+    results = []
+    for name, bench in benches.items():
+        seconds = _best_of(repeat, bench)
+        results.append(
+            {
+                "name": name,
+                "tweets": len(tweets),
+                "seconds": round(seconds, 6),
+                "tweets_per_sec": round(len(tweets) / seconds, 1) if seconds else None,
+            }
+        )
+    return results
+
+
+def main() -> None:
+    args = argparse.ArgumentParser(description="Hot path benchmark suite")
+    args.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000])
+    args.add_argument("--seed", type=int, default=42)
+    args.add_argument("--repeat", type=int, default=3)
+    args.add_argument("--output", type=str, default="", help="JSON file to write")
+    opts = args.parse_args()
+
+    results: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in opts.sizes:
+            results.extend(run_size(size, opts.seed, opts.repeat, Path(tmp)))
+
+    report = {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "seed": opts.seed,
+        "repeat": opts.repeat,
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if opts.output:
+        Path(opts.output).write_text(output + "\n", encoding="utf-8")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
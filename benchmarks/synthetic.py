@@ -0,0 +1,153 @@
+"""
+Seeded generator of synthetic search/recent v2 payloads
+
+The same seed always produces the same tweets, so benchmark runs compare.
+"""
+import random
+from datetime import datetime
+from datetime import timedelta
+from string import ascii_lowercase
+from typing import Any
+from typing import Dict
+from typing import List
+
+# fmt: off
+WORDS = [
+    "code", "python", "learning", "today", "javascript", "project", "day",
+    "developer", "react", "web", "data", "build", "started", "finished",
+    "working", "challenge", "function", "css", "html", "api", "bug", "fixed",
+    "tutorial", "practice", "progress", "team", "open", "source", "github",
+    "deploy", "test", "review", "refactor", "design", "frontend", "backend",
+    "database", "sql", "docker", "linux", "terminal", "coffee", "morning",
+]
+STOP_WORDS = ["the", "and", "with", "for", "a", "to", "of", "my", "i'm", "it's"]
+HASHTAGS = [
+    "100DaysOfCode", "Python", "JavaScript", "CodeNewbie", "WomenWhoCode",
+    "DEVCommunity", "react", "webdev", "MachineLearning", "Rust",
+]
+UNICODE = ["\U0001F680", "\U0001F525", "café", "\\u00e9t\\u00e9", "naïve"]
+# fmt: on
+
+BASE_ID = 1459535890380902405
+BASE_TIME = datetime(2021, 11, 14, 17, 0, 0)
+
+
+def _entity(start: int, name: str, key: str) -> Dict[str, Any]:
+    """Hashtag or mention entity; offsets include the leading # or @"""
+    return {"start": start, "end": start + len(name) + 1, key: name}
+
+
+class SyntheticCorpus:
+    """
+    Produces tweets shaped like search/recent results with `created_at`,
+    `entities` (hashtags, mentions, urls), `public_metrics` and `lang`
+
+    Word choice follows a Zipf-like curve so counts have a long tail.
+    """
+
+    def __init__(self, seed: int = 42) -> None:
+        self.random = random.Random(seed)
+        self._next_id = BASE_ID
+        self._created_at = BASE_TIME
+        self._weights = [1 / rank for rank in range(1, len(WORDS) + 1)]
+
+    def tweet(self) -> Dict[str, Any]:
+        """A single tweet object"""
+        rnd = self.random
+        self._next_id -= rnd.randint(1, 5000)
+        parts: List[str] = []
+        hashtags: List[Dict[str, Any]] = []
+        mentions: List[Dict[str, Any]] = []
+        urls: List[Dict[str, Any]] = []
+        length = 0
+
+        def add(token: str) -> int:
+            nonlocal length
+            start = length + (1 if parts else 0)
+            parts.append(token)
+            length = start + len(token)
+            return start
+
+        if rnd.random() < 0.05:
+            add("RT")
+            handle = f"user{rnd.randint(1, 999)}"
+            start = add(f"@{handle}:")
+            mentions.append(_entity(start, handle, "username"))
+
+        for _ in range(rnd.randint(6, 30)):
+            roll = rnd.random()
+            if roll < 0.06:
+                # Typos and one-off words make up the long tail
+                word = "".join(rnd.choices(ascii_lowercase, k=rnd.randint(3, 12)))
+                add(word)
+            elif roll < 0.60:
+                word = rnd.choices(WORDS, self._weights)[0]
+                if rnd.random() < 0.2:
+                    word = word.capitalize() + rnd.choice(["!", ".", ",", ""])
+                add(word)
+            elif roll < 0.80:
+                add(rnd.choice(STOP_WORDS))
+            elif roll < 0.88:
+                tag = rnd.choice(HASHTAGS)
+                start = add(f"#{tag}")
+                hashtags.append(_entity(start, tag, "tag"))
+            elif roll < 0.92:
+                handle = f"user{rnd.randint(1, 999)}"
+                start = add(f"@{handle}")
+                mentions.append(_entity(start, handle, "username"))
+            elif roll < 0.95:
+                short = f"https://t.co/{rnd.getrandbits(40):010x}"
+                start = add(short)
+                urls.append(
+                    {
+                        "start": start,
+                        "end": start + len(short),
+                        "url": short,
+                        "expanded_url": f"https://example.com/{rnd.randrange(9999)}",
+                        "display_url": "example.com/...",
+                    }
+                )
+            elif roll < 0.98:
+                add(rnd.choice(UNICODE))
+            else:
+                add(f"day{rnd.randint(1, 100)}\n")
+
+        self._created_at -= timedelta(seconds=rnd.randint(1, 60))
+        sections = (("hashtags", hashtags), ("mentions", mentions), ("urls", urls))
+        entities = {key: value for key, value in sections if value}
+
+        tweet: Dict[str, Any] = {
+            "id": str(self._next_id),
+            "text": " ".join(parts),
+            "created_at": self._created_at.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+            "lang": "en",
+            "public_metrics": {
+                "retweet_count": rnd.randint(0, 20),
+                "reply_count": rnd.randint(0, 5),
+                "like_count": rnd.randint(0, 100),
+                "quote_count": rnd.randint(0, 3),
+            },
+        }
+        if entities:
+            tweet["entities"] = entities
+        return tweet
+
+    def tweets(self, count: int) -> List[Dict[str, Any]]:
+        """`count` tweet objects"""
+        return [self.tweet() for _ in range(count)]
+
+    def texts(self, count: int) -> List[str]:
+        """Just the text of `count` tweets"""
+        return [self.tweet()["text"] for _ in range(count)]
+
+    def page(self, size: int = 100, last: bool = False) -> Dict[str, Any]:
+        """A full search/recent response body"""
+        data = self.tweets(size)
+        meta: Dict[str, Any] = {
+            "newest_id": data[0]["id"],
+            "oldest_id": data[-1]["id"],
+            "result_count": len(data),
+        }
+        if not last:
+            meta["next_token"] = f"b26v89c19zqg{self.random.getrandbits(64):016x}"
+        return {"data": data, "meta": meta}
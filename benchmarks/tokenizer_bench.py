@@ -0,0 +1,71 @@
+"""
+Benchmark CountWords.parse_tweet: original per-word regex rules vs Tokenizer
+
+Run from the project root: `python -m benchmarks.tokenizer_bench`
+"""
+import argparse
+import re
+import time
+from string import ascii_letters
+from typing import Dict
+from typing import List
+
+from benchmarks.synthetic import SyntheticCorpus
+from process import CountWords
+from skipwords import skip_words
+
+
+class LegacyCountWords:
+    """CountWords.parse_tweet as it existed before the Tokenizer"""
+
+    def __init__(self) -> None:
+        self.word_count: Dict[str, int] = {}
+        self.hash_count: Dict[str, int] = {}
+        self.skipped = 0
+
+    def parse_tweet(self, text: str) -> None:
+        valid_start_letters = tuple(ascii_letters + "#")
+        valid_end_letters = tuple(ascii_letters)
+        if text.startswith("RT "):
+            return None
+        text = re.sub(r"\\u[a-z|0-9]{4}", "", text)
+        for word in text.replace("\n", " ").lower().split():
+            if (
+                len(word) < 1
+                or len(word) > 42
+                or re.match(r"^https?:\/\/.*$", word)
+                or not word.startswith(valid_start_letters)
+                or not word.endswith(valid_end_letters)
+                or word in skip_words
+            ):
+                self.skipped += 1
+                continue
+            if word.startswith("#"):
+                self.hash_count[word] = self.hash_count.get(word, 0) + 1
+            else:
+                self.word_count[word] = self.word_count.get(word, 0) + 1
+
+
+def run(counter_cls: type, corpus: List[str]) -> float:
+    """Returns tweets per second"""
+    counter = counter_cls()
+    start = time.perf_counter()
+    for tweet in corpus:
+        counter.parse_tweet(tweet)
+    return len(corpus) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    args = argparse.ArgumentParser(description="parse_tweet benchmark")
+    args.add_argument("--tweets", type=int, default=200_000)
+    opts = args.parse_args()
+
+    corpus = SyntheticCorpus().texts(opts.tweets)
+    before = run(LegacyCountWords, corpus)
+    after = run(CountWords, corpus)
+    print(f"legacy:    {before:,.0f} tweets/sec")
+    print(f"tokenizer: {after:,.0f} tweets/sec ({after / before:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
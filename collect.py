@@ -3,66 +3,366 @@ Collect up to seven days of tweets from a given search phrase
 """
 import argparse
 import logging
+import os
 import re
+import time
 from argparse import Namespace
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
 from datetime import datetime
-from time import sleep
+from datetime import timedelta
+from datetime import timezone
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import Union
 
 from secretbox import SecretBox
 
+from datastore import Checkpoint
 from datastore import DataStore
-from twitterapiv2.auth_client import AuthClient
+from datastore import DataStoreWriter
+from twitterapiv2.archive import Archive
 from twitterapiv2.exceptions import InvalidResponseError
 from twitterapiv2.exceptions import ThrottledError
+from twitterapiv2.metrics import Metrics
+from twitterapiv2.metrics import PeriodicDump
+from twitterapiv2.model.recent.recent import Recent as SearchResponse
+from twitterapiv2.rate_limiter import RateLimiter
 from twitterapiv2.search_client import SearchClient
+from twitterapiv2.session import Session
+from twitterapiv2.session import TransportFactory
+from twitterapiv2.transport import Cassette
+from twitterapiv2.transport import RecordingTransport
+from twitterapiv2.transport import ReplayTransport
 
-# Number of seconds to sleep while between throttle checks
-SLEEP_TIME = 60
+# Seconds before "now" used as the end_time of sharded searches
+END_TIME_BUFFER = 30
+# Follow mode adapts its poll interval to find about this many tweets per poll
+FOLLOW_TARGET_TWEETS = 50
+FOLLOW_MIN_INTERVAL = 5
 log = logging.getLogger("collect")
 
 
-def run_search(
+def paginate(
     search_string: str,
-    start_at: datetime,
-    dbclient: DataStore,
-) -> None:
-    """Facilates search, saving tweets into data store"""
-    # Load client secrets and bearer token to environ
-    secrets = SecretBox(auto_load=True)
-    if not secrets.get("TW_BEARER_TOKEN"):
-        AuthClient().set_bearer_token()
+    client: SearchClient,
+    page_token: Optional[str] = None,
+) -> Iterator[SearchResponse]:
+    """
+    Yield each page of a search, starting at `page_token`, until none remain
 
+    Pacing is left to the client's rate limiter; a throttled request is retried
+    once the limiter releases it.
+    """
     total = 0
-    client = (
-        SearchClient().start_time(start_at).max_results(100).tweet_fields("created_at")
-    )
-
     while True:
         log.info("Retrieving Tweets...")
         try:
-            response = client.search(search_string, page_token=client.next_token)
+            response = client.search(search_string, page_token=page_token)
         except InvalidResponseError as err:
             log.critical("Invalid response from HTTP: '%s'", err)
             break
         except ThrottledError:
             log.info("Rate limit reached, resets at: %s UTC", client.limit_reset)
-            while datetime.utcnow() <= client.limit_reset:
-                log.info("Waiting on limit reset, currently: %s UTC", datetime.utcnow())
-                sleep(SLEEP_TIME)
             continue
 
         total += len(response.data)
         log.info("Pulled %s tweets, %s total", len(response.data), total)
         log.debug("Requests remaining: %s", client.limit_remaining)
-        log.debug("ID start: %s - end: %s", response.data[0].id, response.data[-1].id)
+        if response.data:
+            log.debug(
+                "ID start: %s - end: %s", response.data[0].id, response.data[-1].id
+            )
+        yield response
 
-        dbclient.insert_rows(response.data)
-
-        if not client.next_token:
+        page_token = client.next_token
+        if not page_token:
             log.info("No additional pages to poll.")
             break
 
 
+def load_secrets(session: Session) -> None:
+    """Load client secrets and bearer token to environ"""
+    secrets = SecretBox(auto_load=True)
+    if not secrets.get("TW_BEARER_TOKEN"):
+        session.auth_client().set_bearer_token()
+
+
+def build_client(
+    session: Session,
+    start_at: Union[str, datetime, None],
+    end_at: Union[str, datetime, None] = None,
+) -> SearchClient:
+    """Create the search client used for collection"""
+    return (
+        session.search_client()
+        .start_time(start_at)
+        .end_time(end_at)
+        .max_results(100)
+        .tweet_fields("created_at")
+        .project()
+    )
+
+
+def to_iso(dt: datetime) -> str:
+    """Format a datetime as the API's ISO 8601 UTC string"""
+    return dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def from_iso(value: str) -> datetime:
+    """Parse a `to_iso` string back into a UTC datetime"""
+    return datetime.strptime(value, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+
+
+def split_window(
+    start_at: datetime,
+    end_at: datetime,
+    shards: int,
+) -> List[Tuple[datetime, datetime]]:
+    """Split a time window into `shards` consecutive slices"""
+    step = (end_at - start_at) / shards
+    edges = [start_at + step * idx for idx in range(shards)] + [end_at]
+    return list(zip(edges[:-1], edges[1:]))
+
+
+def run_key(start_at: datetime, shards: int) -> str:
+    """Name of a collection run, its start time and number of windows"""
+    return f"{to_iso(start_at)}/{max(shards, 1)}"
+
+
+def new_windows(
+    search_string: str,
+    start_at: datetime,
+    shards: int,
+) -> List[Checkpoint]:
+    """
+    Starting checkpoints for a search. A single window has no end_time, more
+    than one splits the time from `start_at` to now into slices.
+    """
+    run = run_key(start_at, shards)
+    if shards < 2:
+        return [Checkpoint(search_string, to_iso(start_at), "", None, "", "", 0, run)]
+    # The API refuses an end_time less than 10 seconds from now
+    end_at = datetime.now(timezone.utc) - timedelta(seconds=END_TIME_BUFFER)
+    return [
+        Checkpoint(search_string, to_iso(start), to_iso(end), None, "", "", 0, run)
+        for start, end in split_window(start_at, end_at, shards)
+    ]
+
+
+def collect_window(
+    session: Session,
+    checkpoint: Checkpoint,
+    dbclient: DataStoreWriter,
+) -> None:
+    """Paginate one window from its checkpoint, saving a checkpoint per page"""
+    client = build_client(session, checkpoint.start_time, checkpoint.end_time)
+    for response in paginate(checkpoint.query, client, checkpoint.next_token):
+        checkpoint = checkpoint._replace(next_token=client.next_token)
+        if response.data:
+            checkpoint = checkpoint._replace(
+                newest_id=checkpoint.newest_id or str(response.meta.newest_id),
+                oldest_id=str(response.meta.oldest_id),
+                tweet_count=checkpoint.tweet_count + len(response.data),
+            )
+        dbclient.insert_rows(response.data, checkpoint)
+
+
+def run_search(
+    windows: List[Checkpoint],
+    dbclient: DataStoreWriter,
+    transport: Optional[TransportFactory] = None,
+    metrics: Optional[Metrics] = None,
+    archive: Optional[Archive] = None,
+) -> None:
+    """
+    Facilates search, saving tweets into data store. Multiple windows are
+    polled concurrently with a shared connection pool and rate limit.
+
+    With an `archive` every raw response is also kept, see replay.py.
+    """
+    # One limiter for every window; the rate limit is per application. Pacing
+    # would hold every shard to one cadence, so wait only once it is spent.
+    session = Session(
+        maxsize=len(windows),
+        rate_limiter=RateLimiter(paced=False, metrics=metrics),
+        stream=True,
+        transport=transport,
+        metrics=metrics,
+        archive=archive,
+    )
+    load_secrets(session)
+
+    if len(windows) == 1:
+        collect_window(session, windows[0], dbclient)
+    else:
+        with ThreadPoolExecutor(max_workers=len(windows)) as executor:
+            futures = [
+                executor.submit(collect_window, session, window, dbclient)
+                for window in windows
+            ]
+            for future in futures:
+                future.result()
+    log.debug("Connection stats: %s", session.connection_stats)
+
+
+def next_interval(
+    current: float,
+    found: int,
+    elapsed: float,
+    limiter: RateLimiter,
+    max_interval: float,
+) -> float:
+    """
+    Seconds until the next follow poll
+
+    Aims for FOLLOW_TARGET_TWEETS new tweets per poll at the observed tweet
+    rate, backing off when nothing is found, and never polls faster than the
+    remaining rate limit budget can sustain until the reset.
+    """
+    if found and elapsed > 0:
+        target = FOLLOW_TARGET_TWEETS / (found / elapsed)
+    else:
+        target = current * 2
+
+    if limiter.remaining is not None and limiter.reset is not None:
+        budget = (limiter.reset - time.time()) / max(limiter.remaining, 1)
+        target = max(target, budget)
+
+    return min(max(target, FOLLOW_MIN_INTERVAL), max_interval)
+
+
+def follow(
+    search_string: str,
+    start_at: datetime,
+    since_id: Optional[str],
+    dbclient: DataStoreWriter,
+    interval: float,
+    max_interval: float,
+    transport: Optional[TransportFactory] = None,
+    metrics: Optional[Metrics] = None,
+    archive: Optional[Archive] = None,
+) -> None:
+    """
+    Poll for tweets newer than `since_id` until interrupted. Without a
+    `since_id` the first poll collects from `start_at`.
+    """
+    limiter = RateLimiter(paced=False, metrics=metrics)
+    session = Session(
+        rate_limiter=limiter,
+        stream=True,
+        transport=transport,
+        metrics=metrics,
+        archive=archive,
+    )
+    load_secrets(session)
+
+    last_poll = time.monotonic()
+    while True:
+        if since_id is None:
+            client = build_client(session, start_at)
+        else:
+            client = build_client(session, None).since_id(since_id)
+
+        found = 0
+        newest = int(since_id or 0)
+        for response in paginate(search_string, client):
+            dbclient.insert_rows(response.data)
+            found += len(response.data)
+            if response.data:
+                newest = max(newest, int(response.meta.newest_id))
+        since_id = str(newest) if newest else since_id
+
+        now = time.monotonic()
+        elapsed = now - last_poll
+        interval = next_interval(interval, found, elapsed, limiter, max_interval)
+        last_poll = now
+        log.info("Found %s new tweets, next poll in %.0f seconds", found, interval)
+        time.sleep(interval)
+
+
+def resume_windows(
+    datastore: DataStore,
+    search_string: str,
+    start_at: datetime,
+    shards: int = 1,
+) -> Optional[List[Checkpoint]]:
+    """
+    Unfinished windows of a previous run, None when there was no run
+
+    Only checkpoints of the run with the same `start_at` and `shards` are
+    used. A window whose last page was saved (no next_token) is done. The
+    windows of a sharded run are rebuilt, see `rebuild_windows`.
+    """
+    with datastore.connection() as dbclient:
+        checkpoints = dbclient.get_checkpoints(search_string, run_key(start_at, shards))
+    if not checkpoints:
+        return None
+    if shards > 1:
+        return rebuild_windows(search_string, start_at, shards, checkpoints)
+    return [checkpoint for checkpoint in checkpoints if checkpoint.next_token]
+
+
+def rebuild_windows(
+    search_string: str,
+    start_at: datetime,
+    shards: int,
+    checkpoints: List[Checkpoint],
+) -> List[Checkpoint]:
+    """
+    Unfinished windows of a sharded run, rebuilt from its saved checkpoints
+
+    A window that never saved a page has no checkpoint; it is recreated from
+    the neighbouring windows' edges and collected from the start. When the
+    last window is among them the run's end time is estimated from the saved
+    windows, rounded up so no tweets are skipped.
+    """
+    run = run_key(start_at, shards)
+    saved = {}
+    for checkpoint in checkpoints:
+        first = from_iso(checkpoint.start_time)
+        last = from_iso(checkpoint.end_time)
+        saved[round((first - start_at) / (last - first))] = checkpoint
+
+    last_saved = max(saved)
+    end_at = from_iso(saved[last_saved].end_time)
+    if last_saved < shards - 1:
+        # Saved edges are truncated to the second, allow that much per shard
+        end_at = start_at + (end_at - start_at) * shards / (last_saved + 1)
+        end_at += timedelta(seconds=shards)
+        limit = datetime.now(timezone.utc) - timedelta(seconds=END_TIME_BUFFER)
+        end_at = min(end_at, limit)
+
+    windows = []
+    for idx, (start, end) in enumerate(split_window(start_at, end_at, shards)):
+        if idx in saved:
+            if saved[idx].next_token:
+                windows.append(saved[idx])
+            continue
+        # Keep to the edges of saved neighbours so slices neither gap nor overlap
+        begin = saved[idx - 1].end_time if idx - 1 in saved else to_iso(start)
+        finish = saved[idx + 1].start_time if idx + 1 in saved else to_iso(end)
+        windows.append(Checkpoint(search_string, begin, finish, None, "", "", 0, run))
+    return windows
+
+
+def cassette_transport(
+    record: str,
+    replay: str,
+    realtime: bool,
+) -> Optional[TransportFactory]:
+    """Transport for --record or --replay, None to use the live API"""
+    if record:
+        cassette = Cassette(record)
+        return lambda pool: RecordingTransport(cassette, pool)
+    if replay:
+        cassette = Cassette(replay)
+        return lambda pool: ReplayTransport(cassette, realtime=realtime)
+    return None
+
+
 def cli_args() -> Namespace:
     """Control command line interface"""
     filename = datetime.utcnow().strftime("tweets%Y.%m.%d.%H.%M.%S.db")
@@ -101,7 +401,103 @@ def cli_args() -> Namespace:
         choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"],
         help="Logging level. Default: INFO",
     )
-    return cmArgs.parse_args()
+    cmArgs.add_argument(
+        "--commit-every",
+        type=int,
+        default=1,
+        help="Number of pages to batch into each database commit. Default: 1",
+    )
+    cmArgs.add_argument(
+        "--bulk",
+        action="store_true",
+        help="Use WAL journaling and relaxed sync pragmas for faster writes",
+    )
+    cmArgs.add_argument(
+        "--fulltext",
+        action="store_true",
+        help="Keep an FTS5 full-text index of the tweets, see query.py",
+    )
+    cmArgs.add_argument(
+        "--shards",
+        type=int,
+        default=1,
+        help="Split the search window into N slices polled concurrently. Default: 1",
+    )
+    cmArgs.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue the same search from the checkpoints saved in --name",
+    )
+    cmArgs.add_argument(
+        "--follow",
+        action="store_true",
+        help=(
+            "Keep running, polling only for tweets newer than the newest stored "
+            "tweet. start_date is used when the database is empty."
+        ),
+    )
+    cmArgs.add_argument(
+        "--interval",
+        type=float,
+        default=60,
+        help="Initial seconds between --follow polls. Default: 60",
+    )
+    cmArgs.add_argument(
+        "--max-interval",
+        type=float,
+        default=900,
+        help="Longest seconds between --follow polls. Default: 900",
+    )
+    cassette = cmArgs.add_mutually_exclusive_group()
+    cassette.add_argument(
+        "--record",
+        type=str,
+        default="",
+        metavar="CASSETTE",
+        help="Record every API response to a cassette file",
+    )
+    cassette.add_argument(
+        "--replay",
+        type=str,
+        default="",
+        metavar="CASSETTE",
+        help="Replay API responses from a cassette file instead of the network",
+    )
+    cmArgs.add_argument(
+        "--realtime",
+        action="store_true",
+        help="With --replay, hold each response for its recorded latency",
+    )
+    cmArgs.add_argument(
+        "--archive",
+        type=str,
+        default="",
+        metavar="FILE",
+        help="Append every raw API response to FILE, see replay.py",
+    )
+    cmArgs.add_argument(
+        "--metrics",
+        type=str,
+        default="",
+        metavar="FILE",
+        help=(
+            "Write request, parse, insert and throttle timings to FILE at exit. "
+            "Prometheus text format for a .prom file, JSON otherwise."
+        ),
+    )
+    cmArgs.add_argument(
+        "--metrics-every",
+        type=float,
+        default=0,
+        metavar="SECONDS",
+        help="Also write --metrics every N seconds while running. Default: 0",
+    )
+    opts = cmArgs.parse_args()
+    if opts.follow and opts.resume:
+        cmArgs.error("--follow cannot be combined with --resume")
+    if opts.follow and opts.shards > 1:
+        cmArgs.error("--follow cannot be combined with --shards")
+    return opts
 
 
 def clean_search(search: str) -> str:
@@ -124,11 +520,56 @@ def clean_start_date(start_date: str) -> datetime:
 if __name__ == "__main__":
     args = cli_args()
     logging.basicConfig(level=args.log.upper())
-    datastore = DataStore(args.name)
+    metrics = Metrics() if args.metrics else None
+    datastore = DataStore(
+        args.name,
+        commit_every=args.commit_every,
+        profile="bulk" if args.bulk else "default",
+        metrics=metrics,
+        fulltext=args.fulltext,
+    )
     search = clean_search(args.search_term)
     start_at = clean_start_date(args.start_date)
+    transport = cassette_transport(args.record, args.replay, args.realtime)
+    archive = Archive(args.archive) if args.archive else None
+    if args.replay:
+        # Replayed requests are never sent, any token will do
+        os.environ.setdefault("TW_BEARER_TOKEN", "replay")
 
-    with datastore.connection() as dbclient:
-        run_search(search, start_at, dbclient)
+    with ExitStack() as stack:
+        if metrics is not None:
+            dump = PeriodicDump(metrics, args.metrics, args.metrics_every)
+            stack.enter_context(dump)
+
+        if args.follow:
+            with datastore.connection() as reader:
+                since_id = reader.newest_id()
+            with DataStoreWriter(datastore) as writer:
+                follow(
+                    search,
+                    start_at,
+                    since_id,
+                    writer,
+                    args.interval,
+                    args.max_interval,
+                    transport,
+                    metrics,
+                    archive,
+                )
+
+        windows = None
+        if args.resume:
+            windows = resume_windows(datastore, search, start_at, args.shards)
+            if windows is None:
+                log.info("No checkpoint found, starting a new search.")
+            elif not windows:
+                log.info("Search already completed, nothing to resume.")
+                raise SystemExit(0)
+        if windows is None:
+            windows = new_windows(search, start_at, args.shards)
+
+        # Pages are written by a background thread while the next page is fetched
+        with DataStoreWriter(datastore) as writer:
+            run_search(windows, writer, transport, metrics, archive)
 
     raise SystemExit(0)
@@ -1,48 +1,284 @@
 """
 Use sqlite3 to store/access tweet searches
 """
+import json
+import logging
 import sqlite3
+import time
 from contextlib import contextmanager
+from queue import Empty
+from queue import Full
+from queue import Queue
+from threading import Thread
+from typing import Any
+from typing import Collection
+from typing import Counter
+from typing import Dict
 from typing import Generator
+from typing import Iterator
 from typing import List
+from typing import Mapping
+from typing import NamedTuple
 from typing import Optional
+from typing import Tuple
 
+from twitterapiv2.metrics import Metrics
 from twitterapiv2.model.recent.data import Data
 
+# Pragmas applied to the connection on open. "default" leaves sqlite3 as-is
+PRAGMA_PROFILES: Dict[str, Dict[str, str]] = {
+    "default": {},
+    "bulk": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "temp_store": "MEMORY",
+        "cache_size": "-65536",
+    },
+    "read": {
+        "mmap_size": "268435456",
+        "cache_size": "-65536",
+        "query_only": "ON",
+    },
+}
+
+
+class Checkpoint(NamedTuple):
+    """
+    Collection progress of one search window, saved with each page
+
+    `run` names the collection the window belongs to, so windows of other
+    runs of the same query are never resumed in its place.
+    """
+
+    query: str
+    start_time: str
+    end_time: str
+    next_token: Optional[str]
+    newest_id: str
+    oldest_id: str
+    tweet_count: int
+    run: str
+
+
+# `seq` is an INTEGER PRIMARY KEY, so it is the rowid and VACUUM keeps it. The
+# high-water marks, postings and full-text index all refer to tweets by it.
+DATA_TABLE_SQL = (
+    "CREATE TABLE IF NOT EXISTS {} "
+    "(seq INTEGER PRIMARY KEY, id TEXT UNIQUE, created_at TEXT, content TEXT)"
+)
+
+# SQLite strftime format of the API's created_at, e.g. 2021-11-14T05:12:33.000Z
+CREATED_AT_FORMAT = "%Y-%m-%dT%H:%M:%fZ"
+
+# External content FTS5 index of data.content, kept in sync by triggers.
+# '#' is a token character so hashtags are indexed whole.
+FULLTEXT_SQLS = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS data_fts USING fts5(content, "
+    "content='data', content_rowid='seq', tokenize=\"unicode61 tokenchars '#'\")",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS data_fts_vocab USING fts5vocab(data_fts, row)",
+    "CREATE TRIGGER IF NOT EXISTS data_fts_insert AFTER INSERT ON data BEGIN "
+    "INSERT INTO data_fts (rowid, content) VALUES (new.rowid, new.content); END",
+    "CREATE TRIGGER IF NOT EXISTS data_fts_delete AFTER DELETE ON data BEGIN "
+    "INSERT INTO data_fts (data_fts, rowid, content) "
+    "VALUES ('delete', old.rowid, old.content); END",
+    "CREATE TRIGGER IF NOT EXISTS data_fts_update AFTER UPDATE ON data BEGIN "
+    "INSERT INTO data_fts (data_fts, rowid, content) "
+    "VALUES ('delete', old.rowid, old.content); "
+    "INSERT INTO data_fts (rowid, content) VALUES (new.rowid, new.content); END",
+]
+
+# Seconds between checks for a failed writer while the write queue is full
+WRITER_POLL = 0.5
+
+log = logging.getLogger(__name__)
+
+_Page = Tuple[List[Data], Optional[Checkpoint]]
+
 
 class DataStore:
-    def __init__(self, filename: str = ":memory:") -> None:
-        """Without a filename uses memory only. Connect using `.connection()` context"""
+    def __init__(
+        self,
+        filename: str = ":memory:",
+        *,
+        commit_every: int = 1,
+        profile: str = "default",
+        metrics: Optional[Metrics] = None,
+        fulltext: bool = False,
+    ) -> None:
+        """
+        Without a filename uses memory only. Connect using `.connection()` context
+
+        `commit_every` sets how many `.insert_rows()` calls are batched into a
+        single commit. `profile` selects a set of `PRAGMA_PROFILES` to apply.
+        With `metrics`, the time and row count of each insert are recorded.
+
+        `fulltext` creates (and backfills) an FTS5 index of the tweet text that
+        `.insert_rows()` keeps in sync, used by `.term_frequency()`,
+        `.document_frequency()` and `.match()`. Requires SQLite with FTS5.
+        """
+        if commit_every < 1:
+            raise ValueError("commit_every must be 1 or greater.")
+        if profile not in PRAGMA_PROFILES:
+            raise ValueError(f"Unknown pragma profile: '{profile}'")
         self.filename = filename
+        self.commit_every = commit_every
+        self.profile = profile
+        self.metrics = metrics
+        self.fulltext = fulltext
         self.db: Optional[sqlite3.Connection] = None
+        self._pending = 0
+        self._term_ids: Dict[str, int] = {}
+        self._next_term_id = 1
 
     def build_table(self) -> None:
-        """Builds table if it doesn't exist"""
+        """Builds tables if they don't exist"""
         if self.db is None:
             raise Exception("No database connection exists.")
         cursor = self.db.cursor()
-        sql = (
-            "CREATE TABLE IF NOT EXISTS data "
-            "(id TEXT PRIMARY KEY, created_at TEXT, content TEXT)"
-        )
+        sqls = [
+            DATA_TABLE_SQL.format("data"),
+            "CREATE TABLE IF NOT EXISTS word_counts "
+            "(word TEXT PRIMARY KEY, count INTEGER NOT NULL)",
+            "CREATE TABLE IF NOT EXISTS hashtag_counts "
+            "(word TEXT PRIMARY KEY, count INTEGER NOT NULL)",
+            "CREATE TABLE IF NOT EXISTS process_state "
+            "(key TEXT PRIMARY KEY, value INTEGER NOT NULL)",
+            "CREATE TABLE IF NOT EXISTS checkpoints "
+            "(query TEXT, start_time TEXT, end_time TEXT, next_token TEXT, "
+            "newest_id TEXT, oldest_id TEXT, count INTEGER, "
+            "run TEXT NOT NULL DEFAULT '', "
+            "PRIMARY KEY (query, start_time, end_time))",
+            "CREATE TABLE IF NOT EXISTS terms "
+            "(id INTEGER PRIMARY KEY, term TEXT UNIQUE NOT NULL)",
+            "CREATE TABLE IF NOT EXISTS postings "
+            "(term_id INTEGER NOT NULL, tweet INTEGER NOT NULL, "
+            "count INTEGER NOT NULL, PRIMARY KEY (term_id, tweet)) WITHOUT ROWID",
+            "CREATE INDEX IF NOT EXISTS postings_tweet ON postings (tweet)",
+        ]
         try:
-            cursor.execute(sql)
+            self._key_rowids(cursor)
+            self._add_checkpoint_run(cursor)
+            for sql in sqls:
+                cursor.execute(sql)
+            if self.fulltext:
+                self._build_fulltext(cursor)
             self.db.commit()
         finally:
             cursor.close()
 
-    def insert_rows(self, tweets: List[Data]) -> None:
-        """Insert tweets contained in Data"""
+    def _key_rowids(self, cursor: sqlite3.Cursor) -> None:
+        """
+        Copy a data table made without `seq` into one with it, keeping rowids
+
+        The implicit rowids of the old table could be renumbered by VACUUM.
+        Full-text triggers are dropped with the old table and made again.
+        """
+        cursor.execute("SELECT name FROM pragma_table_info('data')")
+        columns = {name for (name,) in cursor.fetchall()}
+        if not columns or "seq" in columns:
+            return
+        cursor.execute(DATA_TABLE_SQL.format("data_keyed"))
+        cursor.execute(
+            "INSERT INTO data_keyed (seq, id, created_at, content) "
+            "SELECT rowid, id, created_at, content FROM data"
+        )
+        cursor.execute("DROP TABLE data")
+        cursor.execute("ALTER TABLE data_keyed RENAME TO data")
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'data_fts'")
+        if cursor.fetchone() is not None:
+            for sql in FULLTEXT_SQLS:
+                cursor.execute(sql)
+
+    def _add_checkpoint_run(self, cursor: sqlite3.Cursor) -> None:
+        """Add the `run` column to a checkpoints table made without it"""
+        cursor.execute("SELECT name FROM pragma_table_info('checkpoints')")
+        columns = {name for (name,) in cursor.fetchall()}
+        if columns and "run" not in columns:
+            cursor.execute(
+                "ALTER TABLE checkpoints ADD COLUMN run TEXT NOT NULL DEFAULT ''"
+            )
+
+    def _build_fulltext(self, cursor: sqlite3.Cursor) -> None:
+        """Create the full-text index, indexing existing rows when it is new"""
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'data_fts'")
+        exists = cursor.fetchone() is not None
+        for sql in FULLTEXT_SQLS:
+            cursor.execute(sql)
+        if not exists:
+            cursor.execute("INSERT INTO data_fts (data_fts) VALUES ('rebuild')")
+
+    def apply_pragmas(self) -> None:
+        """Apply the selected pragma profile to the open connection"""
         if self.db is None:
             raise Exception("No database connection exists.")
+        for pragma, value in PRAGMA_PROFILES[self.profile].items():
+            self.db.execute(f"PRAGMA {pragma}={value}")
+
+    def insert_rows(
+        self,
+        tweets: List[Data],
+        checkpoint: Optional[Checkpoint] = None,
+    ) -> None:
+        """
+        Insert tweets contained in Data, commits every `commit_every` calls
+
+        A `checkpoint` is saved in the same transaction as the tweets
+        """
+        if self.db is None:
+            raise Exception("No database connection exists.")
+        start = time.perf_counter()
+        if checkpoint is not None:
+            self.save_checkpoint(checkpoint)
         cursor = self.db.cursor()
-        sql = "INSERT OR REPLACE INTO data (id, created_at, content) VALUES (?, ?, ?)"
+        # Tweets are immutable; ignoring duplicates keeps each tweet's seq for
+        # the processed high-water mark
+        sql = "INSERT OR IGNORE INTO data (id, created_at, content) VALUES (?, ?, ?)"
         try:
-            for tweet in tweets:
-                cursor.execute(sql, (tweet.id, tweet.created_at, tweet.text))
-            self.db.commit()
+            cursor.executemany(
+                sql, ((tweet.id, tweet.created_at, tweet.text) for tweet in tweets)
+            )
+            self._pending += 1
+            if self._pending >= self.commit_every:
+                self.flush()
         finally:
             cursor.close()
+        if self.metrics is not None:
+            self.metrics.observe("insert_seconds", time.perf_counter() - start)
+            self.metrics.increment("rows_inserted", len(tweets))
+
+    def save_checkpoint(self, checkpoint: Checkpoint) -> None:
+        """Save a checkpoint with the next pending commit"""
+        if self.db is None:
+            raise Exception("No database connection exists.")
+        sql = (
+            "INSERT OR REPLACE INTO checkpoints (query, start_time, end_time, "
+            "next_token, newest_id, oldest_id, count, run) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+        )
+        self.db.execute(sql, checkpoint)
+
+    def get_checkpoints(self, query: str, run: str) -> List[Checkpoint]:
+        """Return saved checkpoints of one run of a search, one per window"""
+        if self.db is None:
+            raise Exception("No database connection exists.")
+        cursor = self.db.cursor()
+        sql = (
+            "SELECT query, start_time, end_time, next_token, newest_id, oldest_id, "
+            "count, run FROM checkpoints WHERE query = ? AND run = ? "
+            "ORDER BY start_time"
+        )
+        try:
+            cursor.execute(sql, (query, run))
+            return [Checkpoint(*row) for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+
+    def flush(self) -> None:
+        """Commit any pending inserts"""
+        if self.db is None:
+            raise Exception("No database connection exists.")
+        self.db.commit()
+        self._pending = 0
 
     def get_text(self) -> List[List[str]]:
         if self.db is None:
@@ -55,6 +291,360 @@ class DataStore:
         finally:
             cursor.close()
 
+    def newest_id(self) -> Optional[str]:
+        """Return the highest stored tweet id, None when empty"""
+        if self.db is None:
+            raise Exception("No database connection exists.")
+        cursor = self.db.cursor()
+        sql = "SELECT MAX(CAST(id AS INTEGER)) FROM data"
+        try:
+            cursor.execute(sql)
+            newest = cursor.fetchone()[0]
+            return str(newest) if newest is not None else None
+        finally:
+            cursor.close()
+
+    def rowid_bounds(self) -> Tuple[int, int]:
+        """Return the lowest and highest rowid of the data table, (0, 0) if empty"""
+        if self.db is None:
+            raise Exception("No database connection exists.")
+        cursor = self.db.cursor()
+        sql = "SELECT MIN(rowid), MAX(rowid) FROM data"
+        try:
+            cursor.execute(sql)
+            low, high = cursor.fetchone()
+            return (low or 0, high or 0)
+        finally:
+            cursor.close()
+
+    def iter_text(
+        self,
+        batch_size: int = 1000,
+        *,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+    ) -> Iterator[str]:
+        """
+        Yield the content of each tweet, fetching `batch_size` rows at a time
+
+        `start` and `end` optionally limit results to an inclusive rowid range
+        """
+        if self.db is None:
+            raise Exception("No database connection exists.")
+        cursor = self.db.cursor()
+        sql = "SELECT content FROM data WHERE rowid BETWEEN ? AND ?"
+        low = start if start is not None else -(2 ** 63)
+        high = end if end is not None else 2 ** 63 - 1
+        try:
+            cursor.execute(sql, (low, high))
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield row[0]
+        finally:
+            cursor.close()
+
+    def term_frequency(self, term: str) -> int:
+        """Number of times a word (or #hashtag) occurs across all tweets"""
+        return self._term_stat("cnt", term)
+
+    def document_frequency(self, term: str) -> int:
+        """Number of tweets containing a word (or #hashtag)"""
+        return self._term_stat("doc", term)
+
+    def match(self, query: str, limit: int = 100) -> List[Tuple[str, str, str]]:
+        """
+        Return (id, created_at, content) of tweets matching an FTS5 query,
+        best matches first. A query of a single word or #hashtag is quoted so
+        it is matched literally.
+        """
+        if self.db is None:
+            raise Exception("No database connection exists.")
+        if not self.fulltext:
+            raise Exception("Full-text index is not enabled.")
+        if len(query.split()) == 1:
+            query = _quote(query.strip())
+        cursor = self.db.cursor()
+        sql = (
+            "SELECT data.id, data.created_at, data.content FROM data_fts "
+            "JOIN data ON data.rowid = data_fts.rowid "
+            "WHERE data_fts MATCH ? ORDER BY rank LIMIT ?"
+        )
+        try:
+            cursor.execute(sql, (query, limit))
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+
+    def _term_stat(self, column: str, term: str) -> int:
+        """Read a column of the full-text vocabulary for one term"""
+        if self.db is None:
+            raise Exception("No database connection exists.")
+        if not self.fulltext:
+            raise Exception("Full-text index is not enabled.")
+        cursor = self.db.cursor()
+        sql = f"SELECT {column} FROM data_fts_vocab WHERE term = ?"
+        try:
+            cursor.execute(sql, (term.lower(),))
+            row = cursor.fetchone()
+            return row[0] if row else 0
+        finally:
+            cursor.close()
+
+    def iter_rows(
+        self,
+        batch_size: int = 1000,
+        *,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+    ) -> Iterator[Tuple[int, str]]:
+        """Like `.iter_text()`, yielding (rowid, content) in rowid order"""
+        if self.db is None:
+            raise Exception("No database connection exists.")
+        cursor = self.db.cursor()
+        sql = (
+            "SELECT rowid, content FROM data WHERE rowid BETWEEN ? AND ? "
+            "ORDER BY rowid"
+        )
+        low = start if start is not None else -(2 ** 63)
+        high = end if end is not None else 2 ** 63 - 1
+        try:
+            cursor.execute(sql, (low, high))
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            cursor.close()
+
+    def iter_dated(
+        self,
+        batch_size: int = 1000,
+        *,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+    ) -> Iterator[Tuple[Optional[str], str]]:
+        """Like `.iter_text()`, yielding (created_at, content)"""
+        if self.db is None:
+            raise Exception("No database connection exists.")
+        cursor = self.db.cursor()
+        sql = "SELECT created_at, content FROM data WHERE rowid BETWEEN ? AND ?"
+        low = start if start is not None else -(2 ** 63)
+        high = end if end is not None else 2 ** 63 - 1
+        try:
+            cursor.execute(sql, (low, high))
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            cursor.close()
+
+    def add_postings(
+        self,
+        tokens: List[Tuple[int, List[str]]],
+        high_water: int,
+    ) -> None:
+        """
+        Store the tokens of each (rowid, tokens) pair as postings and move the
+        postings high-water mark. Terms are interned in the `terms` table.
+        """
+        if self.db is None:
+            raise Exception("No database connection exists.")
+        cursor = self.db.cursor()
+        try:
+            if not self._term_ids:
+                cursor.execute("SELECT term, id FROM terms")
+                self._term_ids = dict(cursor.fetchall())
+                self._next_term_id = max(self._term_ids.values(), default=0) + 1
+            term_ids = self._term_ids
+            new_terms = {
+                term for _, terms in tokens for term in terms if term not in term_ids
+            }
+            if new_terms:
+                # Ids are handed out here so only the new terms are written
+                ids = range(self._next_term_id, self._next_term_id + len(new_terms))
+                new_ids = dict(zip(sorted(new_terms), ids))
+                cursor.executemany(
+                    "INSERT INTO terms (id, term) VALUES (?, ?)",
+                    ((term_id, term) for term, term_id in new_ids.items()),
+                )
+                term_ids.update(new_ids)
+                self._next_term_id = ids.stop
+            postings = (
+                (term_ids[term], rowid, count)
+                for rowid, terms in tokens
+                for term, count in Counter(terms).items()
+            )
+            cursor.executemany(
+                "INSERT OR REPLACE INTO postings (term_id, tweet, count) "
+                "VALUES (?, ?, ?)",
+                postings,
+            )
+            cursor.execute(
+                "INSERT OR REPLACE INTO process_state (key, value) "
+                "VALUES ('postings_high_water', ?)",
+                (high_water,),
+            )
+            self.db.commit()
+        finally:
+            cursor.close()
+
+    def get_posting_counts(
+        self,
+        hashtags: bool = False,
+        *,
+        skip: Collection[str] = (),
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None,
+    ) -> Dict[str, int]:
+        """
+        Word (or with `hashtags`, hashtag) counts aggregated from the postings
+
+        Terms in `skip` are left out. `start_time` (inclusive) and `end_time`
+        (exclusive) limit the count to tweets created in that range. They may
+        be any time SQLite understands and are compared in the stored format.
+        """
+        if self.db is None:
+            raise Exception("No database connection exists.")
+        if start_time is not None:
+            start_time = self._created_at(start_time)
+        if end_time is not None:
+            end_time = self._created_at(end_time)
+        sql = (
+            "SELECT terms.term, SUM(postings.count) FROM postings "
+            "JOIN terms ON terms.id = postings.term_id "
+        )
+        where = ["terms.term LIKE '#%'" if hashtags else "terms.term NOT LIKE '#%'"]
+        params: List[Any] = []
+        if start_time is not None or end_time is not None:
+            sql += "JOIN data ON data.rowid = postings.tweet "
+        if start_time is not None:
+            where.append("data.created_at >= ?")
+            params.append(start_time)
+        if end_time is not None:
+            where.append("data.created_at < ?")
+            params.append(end_time)
+        if skip:
+            where.append("terms.term NOT IN (SELECT value FROM json_each(?))")
+            params.append(json.dumps(sorted(skip)))
+        sql += "WHERE " + " AND ".join(where) + " GROUP BY postings.term_id"
+        cursor = self.db.cursor()
+        try:
+            cursor.execute(sql, params)
+            return dict(cursor.fetchall())
+        finally:
+            cursor.close()
+
+    def _created_at(self, value: str) -> str:
+        """Convert an ISO 8601 time to the created_at format of stored tweets"""
+        if self.db is None:
+            raise Exception("No database connection exists.")
+        cursor = self.db.cursor()
+        try:
+            cursor.execute("SELECT strftime(?, ?)", (CREATED_AT_FORMAT, value))
+            (created_at,) = cursor.fetchone()
+        finally:
+            cursor.close()
+        if created_at is None:
+            raise ValueError(f"Cannot parse time: '{value}'")
+        return str(created_at)
+
+    def reset_postings(self) -> None:
+        """Remove stored postings, terms and the postings high-water mark"""
+        if self.db is None:
+            raise Exception("No database connection exists.")
+        cursor = self.db.cursor()
+        try:
+            cursor.execute("DELETE FROM postings")
+            cursor.execute("DELETE FROM terms")
+            cursor.execute(
+                "DELETE FROM process_state WHERE key = 'postings_high_water'"
+            )
+            self.db.commit()
+        finally:
+            cursor.close()
+        self._term_ids = {}
+
+    def get_high_water(self, key: str = "high_water") -> int:
+        """
+        Return the highest rowid already added to the stored counts, 0 if none
+
+        Use key "postings_high_water" for the postings table.
+        """
+        if self.db is None:
+            raise Exception("No database connection exists.")
+        cursor = self.db.cursor()
+        sql = "SELECT value FROM process_state WHERE key = ?"
+        try:
+            cursor.execute(sql, (key,))
+            row = cursor.fetchone()
+            return row[0] if row else 0
+        finally:
+            cursor.close()
+
+    def add_counts(
+        self,
+        word_count: Mapping[str, int],
+        hash_count: Mapping[str, int],
+        high_water: int,
+    ) -> None:
+        """Add counts into the stored totals and move the high-water mark"""
+        if self.db is None:
+            raise Exception("No database connection exists.")
+        cursor = self.db.cursor()
+        upsert = (
+            "INSERT INTO {} (word, count) VALUES (?, ?) "
+            "ON CONFLICT(word) DO UPDATE SET count = count + excluded.count"
+        )
+        state = (
+            "INSERT OR REPLACE INTO process_state (key, value) "
+            "VALUES ('high_water', ?)"
+        )
+        try:
+            cursor.executemany(upsert.format("word_counts"), word_count.items())
+            cursor.executemany(upsert.format("hashtag_counts"), hash_count.items())
+            cursor.execute(state, (high_water,))
+            self.db.commit()
+        finally:
+            cursor.close()
+
+    def get_word_counts(self) -> Dict[str, int]:
+        """Return stored word counts"""
+        return self._get_counts("word_counts")
+
+    def get_hashtag_counts(self) -> Dict[str, int]:
+        """Return stored hashtag counts"""
+        return self._get_counts("hashtag_counts")
+
+    def reset_counts(self) -> None:
+        """Remove stored counts and the high-water mark"""
+        if self.db is None:
+            raise Exception("No database connection exists.")
+        cursor = self.db.cursor()
+        try:
+            cursor.execute("DELETE FROM word_counts")
+            cursor.execute("DELETE FROM hashtag_counts")
+            cursor.execute("DELETE FROM process_state WHERE key = 'high_water'")
+            self.db.commit()
+        finally:
+            cursor.close()
+
+    def _get_counts(self, table: str) -> Dict[str, int]:
+        """Return all rows of a count table as a dict"""
+        if self.db is None:
+            raise Exception("No database connection exists.")
+        cursor = self.db.cursor()
+        try:
+            cursor.execute(f"SELECT word, count FROM {table}")
+            return dict(cursor.fetchall())
+        finally:
+            cursor.close()
+
     @contextmanager
     def connection(self) -> Generator["DataStore", None, None]:
         """Open/Create database and ensure proper close on exit"""
@@ -63,7 +653,109 @@ class DataStore:
         self.db = sqlite3.connect(self.filename)
         try:
             self.build_table()
+            self.apply_pragmas()
             yield self
         finally:
-            self.db.close()
-            self.db = None
+            try:
+                if self._pending:
+                    self.flush()
+            finally:
+                self.db.close()
+                self.db = None
+
+
+def _quote(term: str) -> str:
+    """Quote a term as an FTS5 string so '#' and other symbols are literal"""
+    return '"' + term.replace('"', '""') + '"'
+
+
+class DataStoreWriter:
+    """
+    Write-behind stage for a DataStore
+
+    Pages given to `.insert_rows()` are queued and inserted by a dedicated
+    thread that owns the DataStore connection. Callers only block when
+    `max_pages` are already waiting. Use as a context manager; every queued
+    page is written before the context exits, including on error.
+    """
+
+    def __init__(self, datastore: DataStore, max_pages: int = 10) -> None:
+        self.datastore = datastore
+        self._queue: "Queue[Optional[_Page]]" = Queue(maxsize=max_pages)
+        self._thread = Thread(target=self._run, name="datastore-writer")
+        self._error: Optional[BaseException] = None
+
+    def __enter__(self) -> "DataStoreWriter":
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type: Any, *args: Any) -> None:
+        if exc_type is None:
+            self.close()
+            return
+        # Never replace the exception already propagating from the body
+        try:
+            self.close()
+        except Exception:
+            log.exception("DataStore writer failed while handling another error")
+
+    def insert_rows(
+        self,
+        tweets: List[Data],
+        checkpoint: Optional[Checkpoint] = None,
+    ) -> None:
+        """Queue tweets to be inserted, blocks while the queue is full"""
+        while True:
+            self._raise_on_error()
+            try:
+                self._queue.put((tweets, checkpoint), timeout=WRITER_POLL)
+                return
+            except Full:
+                continue
+
+    def close(self) -> None:
+        """Write all queued pages, stop the writer thread, and close the store"""
+        while self._thread.is_alive():
+            self._raise_on_error()
+            try:
+                self._queue.put(None, timeout=WRITER_POLL)
+            except Full:
+                continue
+            self._thread.join()
+        self._raise_on_error()
+
+    def _raise_on_error(self) -> None:
+        """Surface a failure from the writer thread to the caller"""
+        if self._error is not None:
+            raise Exception("DataStore writer failed.") from self._error
+
+    def _run(self) -> None:
+        """Writer thread: batch whatever pages are waiting into one insert"""
+        try:
+            with self.datastore.connection() as dbclient:
+                done = False
+                while not done:
+                    page = self._queue.get()
+                    if page is None:
+                        break
+                    batch: List[Data] = []
+                    while page is not None:
+                        tweets, checkpoint = page
+                        batch.extend(tweets)
+                        if checkpoint is not None:
+                            dbclient.save_checkpoint(checkpoint)
+                        try:
+                            page = self._queue.get_nowait()
+                        except Empty:
+                            break
+                    else:
+                        done = True
+                    dbclient.insert_rows(batch)
+        except BaseException as err:
+            self._error = err
+            # Unblock producers; nothing more will be written
+            while True:
+                try:
+                    self._queue.get_nowait()
+                except Empty:
+                    break
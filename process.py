@@ -1,51 +1,93 @@
 """
 Process collected tweets into word count
 """
-import re
+import gzip
+import heapq
+import html
 from argparse import ArgumentParser
 from argparse import Namespace
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
 from pathlib import Path
-from string import ascii_letters
+from typing import AbstractSet
+from typing import Counter
 from typing import Dict
+from typing import Iterator
 from typing import List
+from typing import Mapping
+from typing import Optional
+from typing import TextIO
+from typing import Tuple
+from typing import Union
 
 from datastore import DataStore
 from skipwords import skip_words
+from tokenizer import Tokenizer
+from topk import TopKCounter
+from trends import BUCKET_WIDTHS
+from trends import BucketCounts
+from vocab import TokenCounts
+
+Counts = Union[Counter[str], TokenCounts]
+# Number of font size css classes words are rounded to in the wordmap
+SIZE_CLASSES = 20
 
 
 class CountWords:
-    def __init__(self) -> None:
-        self.word_count: Dict[str, int] = {}
-        self.hash_count: Dict[str, int] = {}
+    def __init__(
+        self,
+        tokenizer: Optional[Tokenizer] = None,
+        capacity: Optional[int] = None,
+        interned: bool = False,
+        buckets: Optional[str] = None,
+    ) -> None:
+        """
+        With a `capacity` words and hashtags are counted approximately, each in a
+        TopKCounter that holds at most `2 * capacity` entries
+
+        With `interned` they are counted in TokenCounts, by vocabulary id
+
+        With `buckets` ("hour" or "day") words and hashtags are also counted per
+        bucket of the tweet's created_at, in `.trends`
+        """
+        if capacity is not None and interned:
+            raise ValueError("capacity and interned cannot be combined.")
+        self.word_count: Counts = Counter()
+        self.hash_count: Counts = Counter()
+        if capacity is not None:
+            self.word_count = TopKCounter(capacity)
+            self.hash_count = TopKCounter(capacity)
+        elif interned:
+            self.word_count = TokenCounts()
+            self.hash_count = TokenCounts()
+        self.trends = BucketCounts(buckets) if buckets is not None else None
         self.skipped = 0
+        self.tokenizer = tokenizer if tokenizer is not None else Tokenizer()
 
-    def parse_tweet(self, text: str) -> None:
-        """Adds words to count"""
-        valid_start_letters = tuple(ascii_letters + "#")
-        valid_end_letters = tuple(ascii_letters)
-
-        # Skip retweets (shouldn't be searched for!)
-        if text.startswith("RT "):
-            return None
-
-        # Strip unicode from text
-        text = re.sub(r"\\u[a-z|0-9]{4}", "", text)
-        for word in text.replace("\n", " ").lower().split():
-            if (
-                len(word) < 1
-                or len(word) > 42
-                or re.match(r"^https?:\/\/.*$", word)
-                or not word.startswith(valid_start_letters)
-                or not word.endswith(valid_end_letters)
-                or word in skip_words
-            ):
-                self.skipped += 1
-                continue
+    def parse_tweet(self, text: str, created_at: Optional[str] = None) -> None:
+        """Adds words to count, and to the bucket of `created_at` if given"""
+        words, hashtags, skipped = self.tokenizer.tokenize(text)
+        self.word_count.update(words)
+        self.hash_count.update(hashtags)
+        self.skipped += skipped
+        if self.trends is not None and created_at:
+            self.trends.update(created_at, words + hashtags)
+
+    def merge(self, other: "CountWords") -> "CountWords":
+        """Add the counts of another CountWords into this one"""
+        self.word_count.update(other.word_count)
+        self.hash_count.update(other.hash_count)
+        self.skipped += other.skipped
+        if self.trends is not None and other.trends is not None:
+            self.trends.merge(other.trends)
+        return self
 
-            if word.startswith("#"):
-                self.hash_count[word] = self.hash_count.get(word, 0) + 1
-            else:
-                self.word_count[word] = self.word_count.get(word, 0) + 1
+    def error_bounds(self) -> Tuple[int, int]:
+        """Most any word and hashtag count can be below its true count"""
+        return (
+            getattr(self.word_count, "error", 0),
+            getattr(self.hash_count, "error", 0),
+        )
 
 
 def cli_args() -> Namespace:
@@ -62,53 +104,414 @@ def cli_args() -> Namespace:
         default=5,
         help="Lower percent (0-100) to remove from output. Default: 5",
     )
-    return args.parse_args()
+    args.add_argument(
+        "--top",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Only show the N highest counts of each output.",
+    )
+    args.add_argument(
+        "--gzip",
+        action="store_true",
+        help="Write gzip compressed .html.gz outputs.",
+    )
+    args.add_argument(
+        "--batch-size",
+        type=int,
+        default=1000,
+        help="Number of rows fetched from the database at a time. Default: 1000",
+    )
+    args.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of processes used to count words. Default: 1",
+    )
+    args.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only count tweets added since the last incremental run.",
+    )
+    args.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Discard stored counts before an incremental run.",
+    )
+    args.add_argument(
+        "--top-k",
+        type=int,
+        default=None,
+        metavar="K",
+        help=(
+            "Count approximately in bounded memory, keeping at most 2*K words and "
+            "hashtags. Counts of frequent words are exact to the reported error."
+        ),
+    )
+    args.add_argument(
+        "--interned",
+        action="store_true",
+        help="Count by interned vocabulary id, aggregated with NumPy if installed.",
+    )
+    args.add_argument(
+        "--postings",
+        action="store_true",
+        help=(
+            "Tokenize new tweets into the stored postings table and count with "
+            "SQL. Skip words are applied at count time. Use --rebuild after "
+            "changing the filter rules."
+        ),
+    )
+    args.add_argument(
+        "--since",
+        type=str,
+        default=None,
+        help="With --postings, only count tweets created at or after this time.",
+    )
+    args.add_argument(
+        "--until",
+        type=str,
+        default=None,
+        help="With --postings, only count tweets created before this time.",
+    )
+    args.add_argument(
+        "--buckets",
+        choices=list(BUCKET_WIDTHS),
+        default=None,
+        help="Also count per hour or day of created_at and report top movers.",
+    )
+    args.add_argument(
+        "--movers",
+        type=int,
+        default=10,
+        help="Number of rising and falling words shown per bucket. Default: 10",
+    )
+    opts = args.parse_args()
+    if opts.top is not None and opts.top < 1:
+        args.error("--top must be 1 or greater")
+    if opts.top_k is not None and opts.incremental:
+        args.error("--top-k cannot be combined with --incremental")
+    if opts.top_k is not None and opts.interned:
+        args.error("--top-k cannot be combined with --interned")
+    if opts.postings and (opts.incremental or opts.top_k or opts.interned):
+        args.error("--postings cannot be combined with other counting modes")
+    if not opts.postings and (opts.since or opts.until):
+        args.error("--since and --until require --postings")
+    if opts.buckets and (opts.postings or opts.incremental):
+        args.error("--buckets cannot be combined with --postings or --incremental")
+    return opts
 
 
-def load_tweets(filename: str) -> List[str]:
-    """Read tweets from database, return just the text"""
+def load_tweets(filename: str, batch_size: int = 1000) -> Iterator[str]:
+    """Stream tweets from database, yielding just the text"""
     if not Path(filename).exists():
         raise FileNotFoundError(f"'{filename} not found")
-    datastore = DataStore(filename)
+    datastore = DataStore(filename, profile="read")
     with datastore.connection() as dbconn:
-        table_rows = dbconn.get_text()
-    return [row[0] for row in table_rows]
-
-
-def create_wordmap(filename: str, words: Dict[str, int], cutoff: int) -> None:
-    """Creates HTML file"""
-    high = max(list(words.values()))
-    show = {wrd: val for wrd, val in words.items() if (val / high) * 100 >= cutoff}
-    show = {wrd: show[wrd] for wrd in sorted(show)}
-    with open(filename, "w", encoding="utf-8") as outfile:
-        outfile.write(
-            "<HTML><STYLE>"
-            "body { background-color: #111111; font-size: 172px; }"
-            "div { width: 80%; margin: 25px 10%; background-color: #DDDDDD; }"
-            "p { margin: 0px; text-align: center; }"
-            "span { margin: -15px; padding: 0px; }"
-            "</STYLE><BODY><DIV>"
-            '<p style="font-size: 36px;">twwrodmap - by Preocts</p>'
-            f'<p style="font-size: 18px;">Total words: {len(words)} '
-            f"| Total shown {len(show)}</p>"
-            '<p style="font-size: 12px;">'
-            f"Showinig top {100 - cutoff}% by highest count.</p><p>"
-        )
-        for word, count in show.items():
-            outfile.write(
-                f'<span style="font-size: {round((count / high) * 100, 0)}%;">'
-                f"{word}</span>\n"
+        yield from dbconn.iter_text(batch_size)
+
+
+def load_dated_tweets(
+    filename: str, batch_size: int = 1000
+) -> Iterator[Tuple[Optional[str], str]]:
+    """Stream tweets from database, yielding (created_at, text)"""
+    if not Path(filename).exists():
+        raise FileNotFoundError(f"'{filename} not found")
+    datastore = DataStore(filename, profile="read")
+    with datastore.connection() as dbconn:
+        yield from dbconn.iter_dated(batch_size)
+
+
+def split_ranges(low: int, high: int, shards: int) -> List[Tuple[int, int]]:
+    """Split an inclusive rowid range into up to `shards` inclusive ranges"""
+    total = high - low + 1
+    if total < 1:
+        return []
+    size = -(-total // shards)
+    return [
+        (start, min(start + size - 1, high)) for start in range(low, high + 1, size)
+    ]
+
+
+def count_shard(
+    filename: str,
+    start: int,
+    end: int,
+    batch_size: int,
+    capacity: Optional[int] = None,
+    interned: bool = False,
+    buckets: Optional[str] = None,
+) -> CountWords:
+    """Count words in a rowid range using its own read-only connection"""
+    counter = CountWords(capacity=capacity, interned=interned, buckets=buckets)
+    with DataStore(filename, profile="read").connection() as dbconn:
+        if buckets is not None:
+            for created_at, tweet in dbconn.iter_dated(
+                batch_size, start=start, end=end
+            ):
+                counter.parse_tweet(tweet, created_at)
+        else:
+            for tweet in dbconn.iter_text(batch_size, start=start, end=end):
+                counter.parse_tweet(tweet)
+    return counter
+
+
+def tree_merge(counters: List[CountWords]) -> CountWords:
+    """Merge counters pairwise until one remains"""
+    if not counters:
+        return CountWords()
+    while len(counters) > 1:
+        merged = [
+            counters[idx].merge(counters[idx + 1])
+            for idx in range(0, len(counters) - 1, 2)
+        ]
+        if len(counters) % 2:
+            merged.append(counters[-1])
+        counters = merged
+    return counters[0]
+
+
+def count_parallel(
+    filename: str,
+    workers: int,
+    batch_size: int = 1000,
+    *,
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+    capacity: Optional[int] = None,
+    interned: bool = False,
+    buckets: Optional[str] = None,
+) -> CountWords:
+    """Shard the data table by rowid and count each shard in a process pool"""
+    if not Path(filename).exists():
+        raise FileNotFoundError(f"'{filename} not found")
+    with DataStore(filename, profile="read").connection() as dbconn:
+        low, high = dbconn.rowid_bounds()
+    low = low if start is None else max(low, start)
+    high = high if end is None else min(high, end)
+
+    # Over-split so uneven rowid gaps don't leave workers idle
+    ranges = split_ranges(low, high, workers * 4)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(
+                count_shard,
+                filename,
+                start,
+                end,
+                batch_size,
+                capacity,
+                interned,
+                buckets,
             )
+            for start, end in ranges
+        ]
+        return tree_merge([future.result() for future in futures])
+
+
+def update_counts(
+    filename: str,
+    workers: int = 1,
+    batch_size: int = 1000,
+    rebuild: bool = False,
+    interned: bool = False,
+) -> Tuple[Dict[str, int], Dict[str, int]]:
+    """Count only rows added since the last run, returns the stored totals"""
+    if not Path(filename).exists():
+        raise FileNotFoundError(f"'{filename} not found")
+    with DataStore(filename).connection() as dbconn:
+        if rebuild:
+            dbconn.reset_counts()
+        start = dbconn.get_high_water() + 1
+        _, end = dbconn.rowid_bounds()
+
+    if workers > 1:
+        counter = count_parallel(
+            filename, workers, batch_size, start=start, end=end, interned=interned
+        )
+    elif start <= end:
+        counter = count_shard(filename, start, end, batch_size, interned=interned)
+    else:
+        counter = CountWords()
+
+    with DataStore(filename).connection() as dbconn:
+        if start <= end:
+            dbconn.add_counts(counter.word_count, counter.hash_count, end)
+        return dbconn.get_word_counts(), dbconn.get_hashtag_counts()
+
+
+def index_postings(
+    filename: str,
+    batch_size: int = 1000,
+    rebuild: bool = False,
+) -> int:
+    """
+    Tokenize rows added since the last pass into the postings table, returns
+    the number of rows tokenized. Skip words are kept so they can be filtered
+    when counting.
+    """
+    if not Path(filename).exists():
+        raise FileNotFoundError(f"'{filename} not found")
+    tokenizer = Tokenizer(skip=frozenset())
+    total = 0
+    with DataStore(filename).connection() as dbconn:
+        if rebuild:
+            dbconn.reset_postings()
+        start = dbconn.get_high_water("postings_high_water") + 1
+        batch: List[Tuple[int, List[str]]] = []
+        for rowid, text in dbconn.iter_rows(batch_size, start=start):
+            words, hashtags, _ = tokenizer.tokenize(text)
+            batch.append((rowid, words + hashtags))
+            if len(batch) >= batch_size:
+                dbconn.add_postings(batch, rowid)
+                total += len(batch)
+                batch = []
+        if batch:
+            dbconn.add_postings(batch, batch[-1][0])
+            total += len(batch)
+    return total
+
+
+def posting_counts(
+    filename: str,
+    skip: Optional[AbstractSet[str]] = None,
+    start_time: Optional[str] = None,
+    end_time: Optional[str] = None,
+) -> Tuple[Dict[str, int], Dict[str, int]]:
+    """Word and hashtag counts aggregated from the postings table"""
+    skip = skip_words if skip is None else skip
+    with DataStore(filename, profile="read").connection() as dbconn:
+        words = dbconn.get_posting_counts(
+            skip=skip, start_time=start_time, end_time=end_time
+        )
+        hashtags = dbconn.get_posting_counts(
+            True, skip=skip, start_time=start_time, end_time=end_time
+        )
+    return words, hashtags
+
+
+def print_movers(trends: BucketCounts, size: int = 10) -> None:
+    """Print the biggest risers and fallers of each bucket"""
+    for previous, bucket, risers, fallers in trends.movers(size):
+        print(f"{previous} -> {bucket}")
+        print("  up:   " + ", ".join(f"{word} +{delta}" for word, delta in risers))
+        print("  down: " + ", ".join(f"{word} {delta}" for word, delta in fallers))
+
+
+def create_wordmap(
+    filename: str,
+    words: Mapping[str, int],
+    cutoff: int,
+    top: Optional[int] = None,
+    compress: bool = False,
+) -> str:
+    """
+    Creates HTML file, returns the name written
+
+    With `top` only the `top` highest counts are considered, picked with a heap
+    rather than a full sort. Word sizes are rounded to one of SIZE_CLASSES css
+    classes. With `compress` the file is gzip compressed and ".gz" is appended.
+    """
+    total = len(words)
+    if top is not None and isinstance(words, TokenCounts):
+        words = words.top(top)
+    elif top is not None:
+        words = dict(heapq.nlargest(top, words.items(), key=itemgetter(1)))
+    if isinstance(words, TokenCounts):
+        # Normalized and filtered as array operations, only shown words are built
+        show = words.above(cutoff)
+        high = max(show.values())
+    else:
+        high = max(list(words.values()))
+        show = {wrd: val for wrd, val in words.items() if (val / high) * 100 >= cutoff}
+
+    step = 100 / SIZE_CLASSES
+    sizes = "".join(
+        f".s{idx} {{ font-size: {round(idx * step)}%; }}"
+        for idx in range(1, SIZE_CLASSES + 1)
+    )
+    header = (
+        "<HTML><STYLE>"
+        "body { background-color: #111111; font-size: 172px; }"
+        "div { width: 80%; margin: 25px 10%; background-color: #DDDDDD; }"
+        "p { margin: 0px; text-align: center; }"
+        "span { margin: -15px; padding: 0px; }"
+        f"{sizes}"
+        "</STYLE><BODY><DIV>"
+        '<p style="font-size: 36px;">twwrodmap - by Preocts</p>'
+        f'<p style="font-size: 18px;">Total words: {total} '
+        f"| Total shown {len(show)}</p>"
+        '<p style="font-size: 12px;">'
+        f"Showinig top {100 - cutoff}% by highest count.</p><p>"
+    )
+    spans = (
+        f'<span class="s{max(round(show[word] / high * SIZE_CLASSES), 1)}">'
+        f"{html.escape(word)}</span>\n"
+        for word in sorted(show)
+    )
+
+    outfile: TextIO
+    if compress:
+        filename += ".gz"
+        outfile = gzip.open(filename, "wt", encoding="utf-8")
+    else:
+        outfile = open(filename, "w", encoding="utf-8")
+    with outfile:
+        outfile.write(header)
+        outfile.writelines(spans)
         outfile.write("</p></div></body></html>")
+    return filename
 
 
 if __name__ == "__main__":
     args = cli_args()
-    counter = CountWords()
-    all_tweets = load_tweets(args.database_name)
-
-    for tweet in all_tweets:
-        counter.parse_tweet(tweet)
+    word_count: Mapping[str, int]
+    hash_count: Mapping[str, int]
+    if args.postings:
+        indexed = index_postings(args.database_name, args.batch_size, args.rebuild)
+        print(f"Tokenized {indexed} new tweets into postings")
+        word_count, hash_count = posting_counts(
+            args.database_name, start_time=args.since, end_time=args.until
+        )
+    elif args.incremental:
+        word_count, hash_count = update_counts(
+            args.database_name,
+            args.workers,
+            args.batch_size,
+            args.rebuild,
+            args.interned,
+        )
+    else:
+        if args.workers > 1:
+            counter = count_parallel(
+                args.database_name,
+                args.workers,
+                args.batch_size,
+                capacity=args.top_k,
+                interned=args.interned,
+                buckets=args.buckets,
+            )
+        else:
+            counter = CountWords(
+                capacity=args.top_k, interned=args.interned, buckets=args.buckets
+            )
+            for created_at, tweet in load_dated_tweets(
+                args.database_name, args.batch_size
+            ):
+                counter.parse_tweet(tweet, created_at)
+        word_count, hash_count = counter.word_count, counter.hash_count
+        if args.top_k is not None:
+            word_error, hash_error = counter.error_bounds()
+            print(f"Approximate counts, words at most {word_error} low")
+            print(f"Approximate counts, hashtags at most {hash_error} low")
+        if counter.trends is not None:
+            print_movers(counter.trends, args.movers)
 
-    create_wordmap(args.database_name + ".words.html", counter.word_count, args.cutoff)
-    create_wordmap(args.database_name + ".htags.html", counter.hash_count, args.cutoff)
+    for suffix, counts in ((".words.html", word_count), (".htags.html", hash_count)):
+        create_wordmap(
+            args.database_name + suffix,
+            counts,
+            args.cutoff,
+            top=args.top,
+            compress=args.gzip,
+        )
@@ -0,0 +1,43 @@
+"""
+Ad-hoc word lookups against the full-text index of a collected database
+"""
+from argparse import ArgumentParser
+from argparse import Namespace
+from pathlib import Path
+
+from datastore import DataStore
+
+
+def cli_args() -> Namespace:
+    """Parse command line args"""
+    args = ArgumentParser(description="Look up words in a collected database")
+    args.add_argument(
+        "database_name",
+        type=str,
+        help="Sqlite3 database file to load. The index is built on first use.",
+    )
+    args.add_argument(
+        "query",
+        type=str,
+        help="Word or #hashtag, or an FTS5 query such as 'python AND coffee'",
+    )
+    args.add_argument(
+        "--limit",
+        type=int,
+        default=10,
+        help="Number of matching tweets to show. Default: 10",
+    )
+    return args.parse_args()
+
+
+if __name__ == "__main__":
+    args = cli_args()
+    if not Path(args.database_name).exists():
+        raise FileNotFoundError(f"'{args.database_name} not found")
+    with DataStore(args.database_name, fulltext=True).connection() as dbclient:
+        if len(args.query.split()) == 1:
+            term = args.query.strip()
+            print(f"Occurrences: {dbclient.term_frequency(term)}")
+            print(f"Tweets: {dbclient.document_frequency(term)}")
+        for tweet_id, created_at, content in dbclient.match(args.query, args.limit):
+            print(f"{tweet_id} {created_at} {' '.join(content.split())}")
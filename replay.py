@@ -0,0 +1,79 @@
+"""
+Rebuild a collected database from a raw response archive, without API calls
+"""
+from argparse import ArgumentParser
+from argparse import Namespace
+from pathlib import Path
+from typing import Tuple
+
+from datastore import DataStore
+from datastore import DataStoreWriter
+from twitterapiv2.archive import Archive
+from twitterapiv2.http import json_loads
+from twitterapiv2.model.recent.recent import Recent as SearchResponse
+
+# Tweet fields the DataStore keeps besides id and text, the only ones parsed
+STORED_FIELDS = frozenset(("created_at",))
+
+
+def replay_archive(filename: str, datastore: DataStore) -> Tuple[int, int]:
+    """
+    Parse every archived page into `datastore`, returns the number of pages and
+    tweets read. Tweets are built with only STORED_FIELDS, see `Data.build_obj`.
+    Tweets already stored are left as they are.
+    """
+    pages = tweets = 0
+    with DataStoreWriter(datastore) as writer:
+        for record in Archive(filename):
+            body = json_loads(record.body)
+            response = SearchResponse.build_obj(body, STORED_FIELDS)
+            writer.insert_rows(response.data)
+            pages += 1
+            tweets += len(response.data)
+    return pages, tweets
+
+
+def cli_args() -> Namespace:
+    """Parse command line args"""
+    args = ArgumentParser(description="Rebuild a database from a response archive")
+    args.add_argument(
+        "archive",
+        type=str,
+        help="Archive written by collect.py --archive",
+    )
+    args.add_argument(
+        "database_name",
+        type=str,
+        help="Sqlite3 database file to write. Created if missing.",
+    )
+    args.add_argument(
+        "--commit-every",
+        type=int,
+        default=100,
+        help="Number of pages to batch into each database commit. Default: 100",
+    )
+    args.add_argument(
+        "--bulk",
+        action="store_true",
+        help="Use WAL journaling and relaxed sync pragmas for faster writes",
+    )
+    args.add_argument(
+        "--fulltext",
+        action="store_true",
+        help="Keep an FTS5 full-text index of the tweets, see query.py",
+    )
+    return args.parse_args()
+
+
+if __name__ == "__main__":
+    args = cli_args()
+    if not Path(args.archive).exists():
+        raise FileNotFoundError(f"'{args.archive} not found")
+    datastore = DataStore(
+        args.database_name,
+        commit_every=args.commit_every,
+        profile="bulk" if args.bulk else "default",
+        fulltext=args.fulltext,
+    )
+    pages, tweets = replay_archive(args.archive, datastore)
+    print(f"Replayed {pages} pages, {tweets} tweets into {args.database_name}")
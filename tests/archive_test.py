@@ -0,0 +1,147 @@
+import json
+import os
+from pathlib import Path
+from typing import Any
+from typing import Dict
+from typing import List
+from unittest.mock import patch
+
+import pytest
+
+from datastore import DataStore
+from replay import replay_archive
+from twitterapiv2.archive import Archive
+from twitterapiv2.session import Session
+from twitterapiv2.transport import CassetteResponse
+from twitterapiv2.transport import Transport
+
+
+def _page(ids: List[str], next_token: str = "") -> bytes:
+    meta: Dict[str, Any] = {"newest_id": ids[0], "oldest_id": ids[-1]}
+    if next_token:
+        meta["next_token"] = next_token
+    data = [
+        {"id": id_, "created_at": "2021-11-14T05:00:00.000Z", "text": f"tweet {id_}"}
+        for id_ in ids
+    ]
+    return json.dumps({"data": data, "meta": meta}).encode()
+
+
+class FakePool(Transport):
+    """Stands in for the network, serves `bodies` in order"""
+
+    def __init__(self, bodies: List[bytes]) -> None:
+        super().__init__()
+        self.bodies = bodies
+
+    def urlopen(self, method: str, url: str, *args: Any, **kw: Any) -> Any:
+        headers = {
+            "x-rate-limit-limit": "450",
+            "x-rate-limit-remaining": str(len(self.bodies)),
+            "x-rate-limit-reset": "1636866000",
+        }
+        return CassetteResponse(200, headers, self.bodies.pop(0))
+
+
+def _collect(archive: Archive, bodies: List[bytes]) -> None:
+    pool = FakePool(bodies)
+    with patch.dict(os.environ, {"TW_BEARER_TOKEN": "token"}):
+        session = Session(transport=lambda _: pool, archive=archive)
+        client = session.search_client().tweet_fields("created_at")
+        client.search("python")
+        while client.next_token:
+            client.search("python", page_token=client.next_token)
+
+
+def test_archive_keeps_raw_pages(tmp_path: Path) -> None:
+    archive = Archive(str(tmp_path / "search.archive"))
+    bodies = [_page(["3", "2"], "abc"), _page(["1"])]
+
+    _collect(archive, list(bodies))
+    records = list(archive)
+
+    assert [record.body for record in records] == bodies
+    assert records[0].fields["query"] == "python"
+    assert "next_token" not in records[0].fields
+    assert records[1].fields["next_token"] == "abc"
+    assert records[0].rate_limit_remaining == "2"
+    assert records[1].rate_limit_reset == "1636866000"
+
+
+def test_replay_rebuilds_datastore(tmp_path: Path) -> None:
+    archive = Archive(str(tmp_path / "search.archive"))
+    _collect(archive, [_page(["3", "2"], "abc"), _page(["1"])])
+    # A frame cut short by a crash is ignored
+    with open(archive.filename, "ab") as outfile:
+        outfile.write(b"\x00\x00\x01\x00partial")
+
+    filename = str(tmp_path / "test.db")
+    pages, tweets = replay_archive(archive.filename, DataStore(filename))
+
+    assert (pages, tweets) == (2, 3)
+    with DataStore(filename).connection() as dbclient:
+        assert dbclient.newest_id() == "3"
+        assert sorted(row[0] for row in dbclient.get_text()) == [
+            "tweet 1",
+            "tweet 2",
+            "tweet 3",
+        ]
+    # Replaying again does not duplicate tweets
+    replay_archive(archive.filename, DataStore(filename))
+    with DataStore(filename).connection() as dbclient:
+        assert len(dbclient.get_text()) == 3
+
+
+def test_replay_stores_created_at(tmp_path: Path) -> None:
+    archive = Archive(str(tmp_path / "search.archive"))
+    _collect(archive, [_page(["1"])])
+
+    filename = str(tmp_path / "test.db")
+    replay_archive(archive.filename, DataStore(filename))
+
+    with DataStore(filename).connection() as dbclient:
+        assert list(dbclient.iter_dated(10)) == [
+            ("2021-11-14T05:00:00.000Z", "tweet 1")
+        ]
+
+
+def test_append_to_empty_file_writes_magic(tmp_path: Path) -> None:
+    archive = Archive(str(tmp_path / "search.archive"))
+    Path(archive.filename).touch()
+
+    _collect(archive, [_page(["1"])])
+
+    assert len(list(archive)) == 1
+
+
+def test_append_after_crash_drops_torn_frame(tmp_path: Path) -> None:
+    archive = Archive(str(tmp_path / "search.archive"))
+    _collect(archive, [_page(["2"])])
+    # The crash left a length prefix and part of its frame
+    with open(archive.filename, "ab") as outfile:
+        outfile.write(b"\x00\x00\x01\x00partial")
+
+    # The next run appends through a new Archive
+    _collect(Archive(archive.filename), [_page(["3"], "abc"), _page(["4"])])
+
+    bodies = [record.body for record in Archive(archive.filename)]
+    assert bodies == [_page(["2"]), _page(["3"], "abc"), _page(["4"])]
+
+
+def test_corrupt_frame_before_the_end_raises(tmp_path: Path) -> None:
+    archive = Archive(str(tmp_path / "search.archive"))
+    _collect(archive, [_page(["2"])])
+    with open(archive.filename, "ab") as outfile:
+        outfile.write(b"\x00\x00\x00\x07garbage")
+    _collect(archive, [_page(["3"])])
+
+    with pytest.raises(ValueError):
+        list(archive)
+
+
+def test_rejects_other_files(tmp_path: Path) -> None:
+    other = tmp_path / "other.db"
+    other.write_bytes(b"SQLite format 3\x00")
+
+    with pytest.raises(ValueError):
+        list(Archive(str(other)))
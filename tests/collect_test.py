@@ -0,0 +1,151 @@
+import json
+import os
+import time
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from pathlib import Path
+from threading import Lock
+from typing import Any
+from typing import List
+from unittest.mock import patch
+
+import pytest
+
+from collect import from_iso
+from collect import next_interval
+from collect import resume_windows
+from collect import run_key
+from collect import run_search
+from collect import split_window
+from collect import to_iso
+from datastore import Checkpoint
+from datastore import DataStore
+from datastore import DataStoreWriter
+from twitterapiv2.metrics import Metrics
+from twitterapiv2.model.responseheader import ResponseHeader
+from twitterapiv2.rate_limiter import RateLimiter
+from twitterapiv2.transport import CassetteResponse
+from twitterapiv2.transport import Transport
+
+START = datetime(2021, 11, 13, tzinfo=timezone.utc)
+END = START + timedelta(days=4, seconds=1234, microseconds=567)
+
+
+def _windows(shards: int) -> List[Checkpoint]:
+    run = run_key(START, shards)
+    return [
+        Checkpoint("python", to_iso(start), to_iso(end), None, "", "", 0, run)
+        for start, end in split_window(START, END, shards)
+    ]
+
+
+class RoomyPool(Transport):
+    """Serves one page per request with plenty of rate limit left"""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self._lock = Lock()
+
+    def urlopen(self, method: str, url: str, *args: Any, **kw: Any) -> Any:
+        with self._lock:
+            self.count += 1
+            id_ = str(self.count)
+        tweet = {"id": id_, "created_at": to_iso(START), "text": "hi"}
+        body = json.dumps({"data": [tweet], "meta": {"newest_id": "1"}})
+        headers = {
+            "x-rate-limit-remaining": "449",
+            "x-rate-limit-reset": str(int(time.time()) + 900),
+        }
+        return CassetteResponse(200, headers, body.encode())
+
+
+def _save(filename: str, checkpoints: List[Checkpoint]) -> None:
+    with DataStore(filename).connection() as dbclient:
+        for checkpoint in checkpoints:
+            dbclient.save_checkpoint(checkpoint)
+        dbclient.flush()
+
+
+def test_resume_restarts_shard_without_checkpoint(tmp_path: Path) -> None:
+    filename = str(tmp_path / "test.db")
+    windows = _windows(4)
+    done = windows[0]._replace(newest_id="9", oldest_id="5", tweet_count=5)
+    resuming = windows[1]._replace(next_token="abc", newest_id="4", tweet_count=3)
+    _save(filename, [done, resuming, windows[3]._replace(newest_id="1")])
+
+    resumed = resume_windows(DataStore(filename), "python", START, shards=4)
+
+    assert resumed == [resuming, windows[2]]
+    assert resume_windows(DataStore(filename), "other", START, shards=4) is None
+
+
+def test_resume_estimates_end_of_missing_last_shard(tmp_path: Path) -> None:
+    filename = str(tmp_path / "test.db")
+    windows = _windows(4)
+    _save(filename, [window._replace(newest_id="1") for window in windows[:3]])
+
+    resumed = resume_windows(DataStore(filename), "python", START, shards=4)
+
+    assert resumed is not None and len(resumed) == 1
+    assert resumed[0].start_time == windows[3].start_time
+    end = from_iso(resumed[0].end_time)
+    assert from_iso(windows[3].end_time) <= end <= END + timedelta(seconds=4)
+
+
+def test_resume_ignores_other_runs_of_the_query(tmp_path: Path) -> None:
+    filename = str(tmp_path / "test.db")
+    later = START + timedelta(days=1)
+    done = Checkpoint("python", to_iso(later), "", None, "9", "1", 9, run_key(later, 1))
+    _save(filename, [done])
+
+    assert resume_windows(DataStore(filename), "python", START) is None
+    assert resume_windows(DataStore(filename), "python", START, shards=4) is None
+    assert resume_windows(DataStore(filename), "python", later) == []
+
+
+def test_run_search_does_not_wait_with_budget_left(tmp_path: Path) -> None:
+    metrics = Metrics()
+    pool = RoomyPool()
+
+    with patch.dict(os.environ, {"TW_BEARER_TOKEN": "token"}):
+        with DataStoreWriter(DataStore(str(tmp_path / "test.db"))) as writer:
+            run_search(_windows(4), writer, lambda _: pool, metrics)
+
+    waits = metrics.histograms["throttle_wait_seconds"]
+    assert waits.count == pool.count == 4
+    assert waits.max == 0
+
+
+def _limiter(remaining: str = "", reset: float = 0) -> RateLimiter:
+    limiter = RateLimiter(paced=False)
+    header = ResponseHeader()
+    header.x_rate_limit_remaining = remaining
+    header.x_rate_limit_reset = str(int(reset)) if reset else ""
+    limiter.update(header)
+    return limiter
+
+
+def test_next_interval_targets_tweet_rate() -> None:
+    # 25 tweets in 60 seconds, 50 are expected in 120
+    assert next_interval(60, 25, 60, _limiter(), 900) == 120
+    # Never below the minimum, however busy the search
+    assert next_interval(60, 1000, 60, _limiter(), 900) == 5
+
+
+def test_next_interval_doubles_when_nothing_found() -> None:
+    assert next_interval(60, 0, 60, _limiter(), 900) == 120
+    assert next_interval(600, 0, 600, _limiter(), 900) == 900
+
+
+def test_next_interval_respects_rate_limit_budget() -> None:
+    limiter = _limiter("10", time.time() + 600)
+
+    # The rate alone would poll every 5 seconds; 10 requests must last 600
+    assert next_interval(60, 1000, 60, limiter, 900) == pytest.approx(60, abs=1)
+
+
+def test_next_interval_clamped_to_max_interval() -> None:
+    limiter = _limiter("1", time.time() + 3000)
+
+    assert next_interval(60, 1, 600, limiter, 900) == 900
@@ -0,0 +1,194 @@
+import sqlite3
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from datastore import Checkpoint
+from datastore import DataStore
+from datastore import DataStoreWriter
+from twitterapiv2.model.recent.data import Data
+
+
+def _tweets(count: int, offset: int = 0) -> List[Data]:
+    return [
+        Data.build_obj({"id": str(idx), "text": f"tweet {idx}", "created_at": "now"})
+        for idx in range(offset, offset + count)
+    ]
+
+
+def _count_rows(filename: str) -> int:
+    with DataStore(filename).connection() as dbclient:
+        return len(dbclient.get_text())
+
+
+def test_insert_rows_commits_each_page(tmp_path: Path) -> None:
+    filename = str(tmp_path / "test.db")
+    with DataStore(filename).connection() as dbclient:
+        dbclient.insert_rows(_tweets(10))
+        assert _count_rows(filename) == 10
+
+
+def test_insert_rows_batches_commits(tmp_path: Path) -> None:
+    filename = str(tmp_path / "test.db")
+    with DataStore(filename, commit_every=2, profile="bulk").connection() as dbclient:
+        dbclient.insert_rows(_tweets(10))
+        assert _count_rows(filename) == 0
+        dbclient.insert_rows(_tweets(10, 10))
+        assert _count_rows(filename) == 20
+        dbclient.insert_rows(_tweets(10, 20))
+    # Pending page flushed on exit
+    assert _count_rows(filename) == 30
+
+
+def test_invalid_arguments() -> None:
+    with pytest.raises(ValueError):
+        DataStore(commit_every=0)
+    with pytest.raises(ValueError):
+        DataStore(profile="missing")
+
+
+def test_iter_text_streams_in_batches(tmp_path: Path) -> None:
+    filename = str(tmp_path / "test.db")
+    with DataStore(filename).connection() as dbclient:
+        dbclient.insert_rows(_tweets(25))
+
+    with DataStore(filename, profile="read").connection() as dbclient:
+        result = list(dbclient.iter_text(batch_size=10))
+
+    assert sorted(result) == sorted(f"tweet {idx}" for idx in range(25))
+
+
+def test_writer_drains_all_pages_on_exit(tmp_path: Path) -> None:
+    filename = str(tmp_path / "test.db")
+    with DataStoreWriter(DataStore(filename), max_pages=2) as writer:
+        for page in range(20):
+            writer.insert_rows(_tweets(10, page * 10))
+
+    assert _count_rows(filename) == 200
+
+
+def test_writer_drains_when_caller_raises(tmp_path: Path) -> None:
+    filename = str(tmp_path / "test.db")
+    with pytest.raises(KeyError):
+        with DataStoreWriter(DataStore(filename)) as writer:
+            writer.insert_rows(_tweets(10))
+            raise KeyError("fetch failed")
+
+    assert _count_rows(filename) == 10
+
+
+def test_writer_surfaces_thread_errors(tmp_path: Path) -> None:
+    filename = str(tmp_path / "missing" / "test.db")
+    with pytest.raises(Exception, match="writer failed"):
+        with DataStoreWriter(DataStore(filename)) as writer:
+            writer.insert_rows(_tweets(10))
+
+
+def test_writer_error_keeps_caller_exception(
+    tmp_path: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+    filename = str(tmp_path / "missing" / "test.db")
+    # The writer thread fails to connect, whenever it gets to run
+    with pytest.raises(KeyError):
+        with DataStoreWriter(DataStore(filename)):
+            raise KeyError("fetch failed")
+
+    assert "DataStore writer failed" in caplog.text
+
+
+def test_checkpoint_saved_with_page(tmp_path: Path) -> None:
+    filename = str(tmp_path / "test.db")
+    start = "2021-11-13T00:00:00Z"
+    first = Checkpoint("python", start, "", "token1", "9", "5", 5, f"{start}/1")
+    second = first._replace(next_token=None, oldest_id="1", tweet_count=9)
+    with DataStoreWriter(DataStore(filename)) as writer:
+        writer.insert_rows(_tweets(5), first)
+        writer.insert_rows(_tweets(4, 5), second)
+    other = first._replace(query="other")
+    with DataStore(filename).connection() as dbclient:
+        dbclient.insert_rows(_tweets(1, 9), other)
+        assert dbclient.get_checkpoints("python", f"{start}/1") == [second]
+        assert dbclient.get_checkpoints("python", f"{start}/2") == []
+
+
+def test_newest_id_compares_numerically() -> None:
+    with DataStore().connection() as dbclient:
+        assert dbclient.newest_id() is None
+        dbclient.insert_rows(_tweets(11))
+        assert dbclient.newest_id() == "10"
+
+
+def test_fulltext_index_backfills_and_stays_in_sync(tmp_path: Path) -> None:
+    filename = str(tmp_path / "test.db")
+    texts = ["Learning #Python today", "python and more python", "rust day"]
+    first = [Data.build_obj({"id": str(i), "text": t}) for i, t in enumerate(texts)]
+    with DataStore(filename).connection() as dbclient:
+        dbclient.insert_rows(first)
+
+    with DataStore(filename, fulltext=True).connection() as dbclient:
+        dbclient.insert_rows([Data.build_obj({"id": "9", "text": "python, again"})])
+        # Duplicates are ignored and must not be indexed twice
+        dbclient.insert_rows(first)
+
+        assert dbclient.term_frequency("python") == 3
+        assert dbclient.document_frequency("Python") == 2
+        assert dbclient.document_frequency("#python") == 1
+        assert dbclient.term_frequency("missing") == 0
+        assert [row[0] for row in dbclient.match("#python")] == ["0"]
+        assert {row[0] for row in dbclient.match("python OR rust")} == {"1", "2", "9"}
+
+
+def test_old_data_table_keeps_rowids_through_vacuum(tmp_path: Path) -> None:
+    filename = str(tmp_path / "test.db")
+    db = sqlite3.connect(filename)
+    db.execute("CREATE TABLE data (id TEXT PRIMARY KEY, created_at TEXT, content TEXT)")
+    db.executemany(
+        "INSERT INTO data (id, created_at, content) VALUES (?, 'now', ?)",
+        [("1", "python one"), ("2", "rust two"), ("3", "python three")],
+    )
+    # A gap in the implicit rowids is what VACUUM is allowed to close up
+    db.execute("DELETE FROM data WHERE id = '1'")
+    db.commit()
+    db.close()
+
+    with DataStore(filename, fulltext=True).connection() as dbclient:
+        assert dbclient.rowid_bounds() == (2, 3)
+    db = sqlite3.connect(filename)
+    columns = db.execute("SELECT name, type, pk FROM pragma_table_info('data')")
+    assert ("seq", "INTEGER", 1) in columns.fetchall()
+    db.execute("VACUUM")
+    db.close()
+
+    with DataStore(filename).connection() as dbclient:
+        assert list(dbclient.iter_rows(10)) == [(2, "rust two"), (3, "python three")]
+        dbclient.insert_rows([Data.build_obj({"id": "4", "text": "python four"})])
+    with DataStore(filename, fulltext=True).connection() as dbclient:
+        assert {row[0] for row in dbclient.match("python")} == {"3", "4"}
+
+
+def test_postings_intern_new_terms_across_batches(tmp_path: Path) -> None:
+    filename = str(tmp_path / "test.db")
+    with DataStore(filename).connection() as dbclient:
+        dbclient.add_postings([(1, ["python", "code"])], 1)
+        dbclient.add_postings([(2, ["python", "rust"])], 2)
+    with DataStore(filename).connection() as dbclient:
+        dbclient.add_postings([(3, ["rust", "go", "go"])], 3)
+        assert dbclient.get_posting_counts() == {
+            "python": 2,
+            "code": 1,
+            "rust": 2,
+            "go": 2,
+        }
+        dbclient.reset_postings()
+        dbclient.add_postings([(1, ["zig"])], 1)
+        assert dbclient.get_posting_counts() == {"zig": 1}
+    db = sqlite3.connect(filename)
+    assert db.execute("SELECT id, term FROM terms").fetchall() == [(1, "zig")]
+    db.close()
+
+
+def test_fulltext_requires_option() -> None:
+    with DataStore().connection() as dbclient:
+        with pytest.raises(Exception):
+            dbclient.term_frequency("python")
@@ -0,0 +1,77 @@
+import json
+import os
+from pathlib import Path
+from typing import List
+from typing import Tuple
+from unittest.mock import patch
+
+import pytest
+
+from datastore import DataStore
+from twitterapiv2.exceptions import ThrottledError
+from twitterapiv2.metrics import Metrics
+from twitterapiv2.session import Session
+from twitterapiv2.transport import Cassette
+from twitterapiv2.transport import CassetteResponse
+from twitterapiv2.transport import ReplayTransport
+
+URL = "https://api.twitter.com/2/tweets/search/recent"
+
+
+def test_histogram_buckets_and_hooks() -> None:
+    metrics = Metrics()
+    seen: List[Tuple[str, float]] = []
+    metrics.add_hook(lambda name, value: seen.append((name, value)))
+
+    for value in (0.002, 0.003, 120):
+        metrics.observe("insert_seconds", value)
+    metrics.increment("rows_inserted", 100)
+
+    summary = metrics.snapshot()["histograms"]["insert_seconds"]
+    assert summary["count"] == 3
+    assert summary["max"] == 120
+    assert summary["buckets"]["0.005"] == 2
+    assert summary["buckets"]["300"] == 1
+    assert seen[-1] == ("rows_inserted", 100)
+
+
+def test_prometheus_buckets_are_cumulative(tmp_path: Path) -> None:
+    metrics = Metrics()
+    metrics.observe("http_response_bytes", 2_000)
+    metrics.observe("http_response_bytes", 3_000_000)
+    metrics.increment("http_errors_429")
+
+    metrics.dump(str(tmp_path / "run.prom"))
+    text = (tmp_path / "run.prom").read_text()
+
+    assert "twwordmap_http_errors_429_total 1" in text
+    assert 'twwordmap_http_response_bytes_bucket{le="4096"} 1' in text
+    assert 'twwordmap_http_response_bytes_bucket{le="+Inf"} 2' in text
+    assert "twwordmap_http_response_bytes_count 2" in text
+
+
+def test_collection_stages_are_recorded(tmp_path: Path) -> None:
+    body = b'{"data": [{"id": "1", "text": "hi"}], "meta": {"result_count": 1}}'
+    cassette = Cassette(str(tmp_path / "search.jsonl.gz"))
+    cassette.append("GET", URL, CassetteResponse(200, {}, body))
+    throttled = {"x-rate-limit-remaining": "0", "x-rate-limit-reset": "1"}
+    cassette.append("GET", URL, CassetteResponse(429, throttled, b"{}"))
+    metrics = Metrics()
+    session = Session(transport=lambda _: ReplayTransport(cassette), metrics=metrics)
+    datastore = DataStore(metrics=metrics)
+
+    with patch.dict(os.environ, {"TW_BEARER_TOKEN": "token"}):
+        response = session.search_client().search("hi")
+        with datastore.connection() as dbclient:
+            dbclient.insert_rows(response.data)
+        with pytest.raises(ThrottledError):
+            session.search_client().search("hi")
+
+    metrics.dump(str(tmp_path / "run.json"))
+    result = json.loads((tmp_path / "run.json").read_text())
+    histograms = result["histograms"]
+    assert histograms["http_request_seconds"]["count"] == 1
+    assert histograms["http_response_bytes"]["sum"] == len(body)
+    assert histograms["parse_seconds"]["count"] == 1
+    assert histograms["insert_seconds"]["count"] == 1
+    assert result["counters"] == {"rows_inserted": 1, "http_errors_429": 1}
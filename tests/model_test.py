@@ -0,0 +1,72 @@
+from typing import Any
+from typing import Dict
+
+from twitterapiv2.model.recent.data import Data
+from twitterapiv2.model.recent.recent import Recent
+
+PAYLOAD: Dict[str, Any] = {
+    "data": [
+        {
+            "id": "1",
+            "text": "hello #world",
+            "created_at": "2021-11-13T15:04:11.000Z",
+            "reply_settings": "everyone",
+            "entities": {"hashtags": [{"start": 6, "end": 12, "tag": "world"}]},
+            "public_metrics": {"like_count": 4},
+            "referenced_tweets": [{"type": "quoted", "id": "2"}],
+        },
+        {"id": "2", "text": "plain"},
+    ],
+    "meta": {"count": 2, "next_token": "abc"},
+}
+
+
+def test_build_recent() -> None:
+    result = Recent.build_obj(PAYLOAD)
+
+    assert [tweet.id for tweet in result.data] == ["1", "2"]
+    assert result.meta.next_token == "abc"
+    assert result.data[0].reply_settings == "everyone"
+
+
+def test_nested_sections_decode_lazily() -> None:
+    tweet = Data.build_obj(PAYLOAD["data"][0])
+
+    assert tweet.entities is not None
+    assert tweet.entities.hashtags[0].tag == "world"
+    assert tweet.entities.urls == []
+    assert tweet.public_metrics is not None
+    assert tweet.public_metrics.like_count == 4
+    assert tweet.referenced_tweets[0].id == "2"
+    # Decoded once, then cached
+    assert tweet.entities is tweet.entities
+
+
+def test_missing_nested_sections() -> None:
+    tweet = Data.build_obj(PAYLOAD["data"][1])
+
+    assert tweet.entities is None
+    assert tweet.geo is None
+    assert tweet.referenced_tweets == []
+
+
+def test_nested_sections_can_be_assigned() -> None:
+    tweet = Data.build_obj(PAYLOAD["data"][1])
+    tweet.geo = None
+    tweet.referenced_tweets = []
+
+    assert tweet.geo is None
+    assert not hasattr(tweet, "__dict__")
+
+
+def test_projected_build_only_sets_requested_fields() -> None:
+    result = Recent.build_obj(PAYLOAD, frozenset(("created_at", "public_metrics")))
+    tweet = result.data[0]
+
+    assert tweet.id == "1"
+    assert tweet.created_at == "2021-11-13T15:04:11.000Z"
+    assert tweet.public_metrics is not None
+    assert tweet.public_metrics.like_count == 4
+    # Present in the payload but not requested
+    assert tweet.entities is None
+    assert tweet.reply_settings is None
@@ -0,0 +1,150 @@
+import gzip
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from datastore import DataStore
+from process import cli_args
+from process import count_parallel
+from process import CountWords
+from process import create_wordmap
+from process import index_postings
+from process import posting_counts
+from process import split_ranges
+from process import update_counts
+from tokenizer import Tokenizer
+from twitterapiv2.model.recent.data import Data
+
+
+def test_tokenize_rules() -> None:
+    text = (
+        "Learning Python today! #100DaysOfCode https://t.co/abc caf\\u00e9 "
+        "the 100days code\n" + "x" * 43 + " #Python @someone"
+    )
+    words, hashtags, skipped = Tokenizer().tokenize(text)
+
+    assert words == ["learning", "python", "caf", "code"]
+    assert hashtags == ["#100daysofcode", "#python"]
+    # today!, link, the, 100days, long word, @someone
+    assert skipped == 6
+
+
+def test_tokenize_skips_retweets() -> None:
+    assert Tokenizer().tokenize("RT @someone: python code") == ([], [], 0)
+
+
+def test_tokenize_custom_skip_words() -> None:
+    words, _, skipped = Tokenizer(skip={"python"}).tokenize("python the code")
+    assert words == ["the", "code"]
+    assert skipped == 1
+
+
+def test_count_words_accumulates() -> None:
+    counter = CountWords()
+    counter.parse_tweet("python code #python")
+    counter.parse_tweet("Python rocks")
+
+    assert counter.word_count == {"python": 2, "code": 1, "rocks": 1}
+    assert counter.hash_count == {"#python": 1}
+    assert counter.skipped == 0
+
+
+def test_split_ranges() -> None:
+    assert split_ranges(1, 10, 3) == [(1, 4), (5, 8), (9, 10)]
+    assert split_ranges(1, 2, 4) == [(1, 1), (2, 2)]
+    assert split_ranges(0, -1, 4) == []
+
+
+def test_count_parallel_matches_serial(tmp_path: Path) -> None:
+    filename = str(tmp_path / "test.db")
+    texts = [f"python code word{chr(97 + idx % 26)} #tag{idx % 3}" for idx in range(50)]
+    tweets = [Data.build_obj({"id": str(i), "text": t}) for i, t in enumerate(texts)]
+    with DataStore(filename).connection() as dbclient:
+        dbclient.insert_rows(tweets)
+
+    serial = CountWords()
+    for text in texts:
+        serial.parse_tweet(text)
+    result = count_parallel(filename, workers=2, batch_size=7)
+
+    assert result.word_count == serial.word_count
+    assert result.hash_count == serial.hash_count
+
+
+def test_update_counts_only_counts_new_rows(tmp_path: Path) -> None:
+    filename = str(tmp_path / "test.db")
+    first = [Data.build_obj({"id": "1", "text": "python code #tag"})]
+    second = [
+        Data.build_obj({"id": "1", "text": "python code #tag"}),
+        Data.build_obj({"id": "2", "text": "python rocks"}),
+    ]
+    with DataStore(filename).connection() as dbclient:
+        dbclient.insert_rows(first)
+    words, hashtags = update_counts(filename)
+    assert words == {"python": 1, "code": 1}
+    assert hashtags == {"#tag": 1}
+
+    with DataStore(filename).connection() as dbclient:
+        dbclient.insert_rows(second)
+    words, _ = update_counts(filename)
+    assert words == {"python": 2, "code": 1, "rocks": 1}
+
+    # Nothing new; stored counts are returned unchanged
+    assert update_counts(filename)[0] == words
+    assert update_counts(filename, rebuild=True)[0] == words
+
+
+def test_postings_count_without_retokenizing(tmp_path: Path) -> None:
+    filename = str(tmp_path / "test.db")
+    rows = [
+        ("1", "2021-11-13T10:00:00.000Z", "python and code python #tag"),
+        ("2", "2021-11-14T10:00:00.000Z", "the python rocks #Tag"),
+    ]
+    tweets = [
+        Data.build_obj({"id": id_, "created_at": created, "text": text})
+        for id_, created, text in rows
+    ]
+    with DataStore(filename).connection() as dbclient:
+        dbclient.insert_rows(tweets[:1])
+    assert index_postings(filename, batch_size=1) == 1
+    with DataStore(filename).connection() as dbclient:
+        dbclient.insert_rows(tweets)
+    assert index_postings(filename, batch_size=1) == 1
+
+    words, hashtags = posting_counts(filename)
+    assert words == {"python": 3, "code": 1, "rocks": 1}
+    assert hashtags == {"#tag": 2}
+
+    words, _ = posting_counts(filename, skip={"python"})
+    assert words == {"and": 1, "code": 1, "the": 1, "rocks": 1}
+
+    words, _ = posting_counts(filename, start_time="2021-11-14")
+    assert words == {"python": 1, "rocks": 1}
+
+    # Bounds in the API's own format are compared as the stored times
+    words, _ = posting_counts(filename, start_time="2021-11-14T10:00:00Z")
+    assert words == {"python": 1, "rocks": 1}
+    words, _ = posting_counts(filename, end_time="2021-11-14T10:00:00Z")
+    assert words == {"python": 2, "code": 1}
+
+
+def test_create_wordmap_top_and_gzip(tmp_path: Path) -> None:
+    words = {"<b>": 50, "python": 100, "code": 3, "rust": 20}
+
+    written = create_wordmap(str(tmp_path / "map.html"), words, 0, top=3, compress=True)
+
+    assert written.endswith(".html.gz")
+    with gzip.open(written, "rt", encoding="utf-8") as infile:
+        page = infile.read()
+    assert "Total words: 4 | Total shown 3" in page
+    assert '<span class="s20">python</span>' in page
+    assert '<span class="s10">&lt;b&gt;</span>' in page
+    assert "code</span>" not in page
+    assert page.endswith("rust</span>\n</p></div></body></html>")
+
+
+def test_cli_rejects_top_below_one() -> None:
+    with patch("sys.argv", ["process.py", "test.db", "--top", "0"]):
+        with pytest.raises(SystemExit):
+            cli_args()
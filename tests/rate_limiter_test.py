@@ -0,0 +1,97 @@
+from typing import List
+
+from twitterapiv2.model.responseheader import ResponseHeader
+from twitterapiv2.rate_limiter import RateLimiter
+from twitterapiv2.rate_limiter import RESET_MARGIN
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+        self.sleeps: List[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _header(remaining: str, reset: str) -> ResponseHeader:
+    header = ResponseHeader()
+    header.x_rate_limit_remaining = remaining
+    header.x_rate_limit_reset = reset
+    return header
+
+
+def _limiter(clock: FakeClock, paced: bool = True) -> RateLimiter:
+    return RateLimiter(paced=paced, clock=clock, sleeper=clock.sleep)
+
+
+def test_no_wait_without_budget_information() -> None:
+    clock = FakeClock()
+    limiter = _limiter(clock)
+    limiter.acquire()
+    limiter.update(_header("", ""))
+    limiter.acquire()
+    assert clock.sleeps == []
+
+
+def test_paces_evenly_across_window() -> None:
+    clock = FakeClock()
+    limiter = _limiter(clock)
+    limiter.update(_header("4", "1100"))
+
+    for _ in range(4):
+        limiter.acquire()
+
+    # 100 seconds left for 4 requests
+    assert clock.sleeps == [25.0, 25.0, 25.0]
+    assert limiter.remaining == 0
+
+
+def test_sleeps_exactly_until_reset_when_exhausted() -> None:
+    clock = FakeClock()
+    limiter = _limiter(clock, paced=False)
+    limiter.update(_header("1", "1060"))
+
+    limiter.acquire()
+    limiter.acquire()
+
+    assert clock.sleeps == [60.0 + RESET_MARGIN]
+    # Window rolled over; budget unknown so no further waiting
+    limiter.acquire()
+    assert len(clock.sleeps) == 1
+
+
+def test_throttle_without_headers_uses_default_wait() -> None:
+    clock = FakeClock()
+    limiter = _limiter(clock)
+    limiter.update(_header("", ""), status=429)
+
+    assert limiter.remaining == 0
+    assert limiter.reset is not None and limiter.reset > clock.now
+
+
+def test_throttle_uses_reset_header() -> None:
+    clock = FakeClock()
+    limiter = _limiter(clock)
+    limiter.update(_header("", ""), status=429)
+    limiter.update(_header("0", "1010"), status=429)
+
+    assert limiter.reset == 1010
+    limiter.acquire()
+    assert clock.sleeps == [10 + RESET_MARGIN]
+
+
+def test_same_window_keeps_lowest_remaining() -> None:
+    clock = FakeClock()
+    limiter = _limiter(clock, paced=False)
+    limiter.update(_header("10", "1100"))
+    limiter.acquire()
+    limiter.acquire()
+    limiter.update(_header("9", "1100"))
+    assert limiter.remaining == 8
+    limiter.update(_header("450", "2000"))
+    assert limiter.remaining == 450
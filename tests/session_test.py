@@ -0,0 +1,58 @@
+from http.server import BaseHTTPRequestHandler
+from http.server import HTTPServer
+from threading import Thread
+from typing import Any
+from typing import Iterator
+
+import pytest
+
+from twitterapiv2.session import Session
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    """Answers every GET with a small body on a persistent connection"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        body = b"{}"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: Any) -> None:
+        ...
+
+
+@pytest.fixture
+def server_url() -> Iterator[str]:
+    server = HTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    thread = Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}/"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_builder_chain_shares_session_pool() -> None:
+    session = Session()
+    client = session.search_client()
+    chained = client.max_results(10).tweet_fields("created_at").project()
+
+    assert chained is not client
+    assert chained.http is client.http is session.http
+    assert session.search_client().http is session.http
+    assert session.auth_client().http is session.http
+
+
+def test_connection_stats_count_reused_connections(server_url: str) -> None:
+    session = Session()
+    assert session.connection_stats == {"requests": 0, "connections": 0, "reused": 0}
+
+    for _ in range(3):
+        assert session.http.request("GET", server_url).data == b"{}"
+
+    assert session.connection_stats == {"requests": 3, "connections": 1, "reused": 2}
@@ -0,0 +1,53 @@
+import pickle
+import random
+from collections import Counter
+from typing import List
+
+import pytest
+
+from process import CountWords
+from process import tree_merge
+from topk import TopKCounter
+
+
+def _words(seed: int, count: int) -> List[str]:
+    rnd = random.Random(seed)
+    return [f"w{int(rnd.paretovariate(1.1))}x" for _ in range(count)]
+
+
+def test_counts_stay_within_error_bound() -> None:
+    words = _words(1, 50_000)
+    exact = Counter(words)
+    counter = TopKCounter(50)
+    for idx in range(0, len(words), 20):
+        counter.update(words[idx : idx + 20])
+
+    assert len(counter) <= 100
+    assert 0 < counter.error <= counter.error_bound
+    for word, count in exact.items():
+        assert exact[word] - counter.error <= counter[word] <= count
+        if count > counter.error:
+            assert word in counter
+
+
+def test_merge_and_pickle_keep_bounds() -> None:
+    words = _words(2, 20_000)
+    counters = [CountWords(capacity=20) for _ in range(4)]
+    for idx, word in enumerate(words):
+        counters[idx % 4].parse_tweet(word)
+    counters = [pickle.loads(pickle.dumps(counter)) for counter in counters]
+
+    merged = tree_merge(counters)
+    word_error, _ = merged.error_bounds()
+    exact = Counter(words)
+
+    assert isinstance(merged.word_count, TopKCounter)
+    assert merged.word_count.total_count == len(words)
+    assert word_error <= merged.word_count.error_bound
+    for word, count in merged.word_count.items():
+        assert exact[word] - word_error <= count <= exact[word]
+
+
+def test_capacity_must_be_positive() -> None:
+    with pytest.raises(ValueError):
+        TopKCounter(0)
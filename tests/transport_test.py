@@ -0,0 +1,115 @@
+import json
+import os
+from pathlib import Path
+from typing import Any
+from typing import Dict
+from typing import List
+from unittest.mock import patch
+
+import pytest
+
+from twitterapiv2.exceptions import CassetteMissError
+from twitterapiv2.session import Session
+from twitterapiv2.transport import Cassette
+from twitterapiv2.transport import CassetteResponse
+from twitterapiv2.transport import RecordingTransport
+from twitterapiv2.transport import ReplayTransport
+from twitterapiv2.transport import Transport
+
+URL = "https://api.twitter.com/2/tweets/search/recent"
+
+
+def _page(ids: List[str], next_token: str = "") -> bytes:
+    meta: Dict[str, Any] = {"newest_id": ids[0], "oldest_id": ids[-1]}
+    if next_token:
+        meta["next_token"] = next_token
+    data = [{"id": id_, "text": f"tweet {id_}"} for id_ in ids]
+    return json.dumps({"data": data, "meta": meta}).encode()
+
+
+class FakePool(Transport):
+    """Stands in for a PoolManager, serves `bodies` in order"""
+
+    def __init__(self, bodies: List[bytes]) -> None:
+        self.bodies = bodies
+        self.urls: List[str] = []
+
+    def urlopen(self, method: str, url: str, *args: Any, **kw: Any) -> CassetteResponse:
+        self.urls.append(url)
+        headers = {"x-rate-limit-remaining": "449", "x-rate-limit-reset": "1"}
+        return CassetteResponse(200, headers, self.bodies.pop(0))
+
+
+def _search(session: Session) -> List[str]:
+    client = session.search_client().max_results(10)
+    ids = [tweet.id for tweet in client.search("python").data]
+    while client.next_token:
+        response = client.search("python", page_token=client.next_token)
+        ids += [tweet.id for tweet in response.data]
+    return ids
+
+
+def test_record_then_replay(tmp_path: Path) -> None:
+    cassette = Cassette(str(tmp_path / "search.jsonl.gz"))
+    pool = FakePool([_page(["3", "2"], "abc"), _page(["1"])])
+
+    with patch.dict(os.environ, {"TW_BEARER_TOKEN": "token"}):
+        recorder = RecordingTransport(cassette, pool)
+        session = Session(transport=lambda _: recorder)
+        recorded = _search(session)
+
+        replay = ReplayTransport(cassette)
+        session = Session(transport=lambda _: replay, stream=True)
+        replayed = _search(session)
+
+    assert recorded == replayed == ["3", "2", "1"]
+    assert [entry["url"] for entry in cassette.load()] == pool.urls
+    assert replay.remaining == 0
+
+
+def test_replay_falls_back_to_path_then_misses(tmp_path: Path) -> None:
+    cassette = Cassette(str(tmp_path / "search.jsonl.gz"))
+    cassette.append("GET", URL + "?end_time=1", CassetteResponse(200, {}, b"{}"))
+    replay = ReplayTransport(cassette)
+
+    assert replay.request("GET", URL, fields={"end_time": "2"}).data == b"{}"
+    with pytest.raises(CassetteMissError):
+        replay.request("GET", URL, fields={"end_time": "2"})
+
+
+def test_replay_fallback_matches_nearest_window(tmp_path: Path) -> None:
+    cassette = Cassette(str(tmp_path / "search.jsonl.gz"))
+    day = "2021-11-14T"
+    for start, end in (("00", "06"), ("06", "12")):
+        query = f"?start_time={day}{start}:00:00Z&end_time={day}{end}:00:00Z"
+        cassette.append("GET", URL + query, CassetteResponse(200, {}, start.encode()))
+    replay = ReplayTransport(cassette)
+
+    # Shards of a later run ask in the other order with slightly shifted times
+    late = {"start_time": "2021-11-14T06:00:05Z", "end_time": "2021-11-14T12:00:05Z"}
+    early = {"start_time": "2021-11-14T00:00:05Z", "end_time": "2021-11-14T06:00:05Z"}
+
+    assert replay.request("GET", URL, fields=late).data == b"06"
+    assert replay.request("GET", URL, fields=early).data == b"00"
+
+
+def test_replay_realtime_sleeps_recorded_latency(tmp_path: Path) -> None:
+    cassette = Cassette(str(tmp_path / "search.jsonl.gz"))
+    cassette.append("GET", URL, CassetteResponse(200, {}, b"{}", elapsed=0.25))
+    sleeps: List[float] = []
+
+    ReplayTransport(cassette, sleeper=sleeps.append).request("GET", URL)
+    ReplayTransport(cassette, realtime=True, sleeper=sleeps.append).request("GET", URL)
+
+    assert sleeps == [0.25]
+
+
+def test_recording_redacts_access_token(tmp_path: Path) -> None:
+    cassette = Cassette(str(tmp_path / "auth.jsonl.gz"))
+    body = b'{"token_type":"bearer","access_token":"secret"}'
+    recorder = RecordingTransport(cassette, FakePool([body]))
+
+    resp = recorder.request_encode_url("POST", "https://api.twitter.com/oauth2/token")
+
+    assert resp.data == body
+    assert "secret" not in cassette.load()[0]["body"]
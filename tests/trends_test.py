@@ -0,0 +1,100 @@
+import pickle
+from pathlib import Path
+from typing import List
+from typing import Tuple
+
+import pytest
+
+from datastore import DataStore
+from process import count_parallel
+from process import CountWords
+from process import tree_merge
+from trends import BucketCounts
+from twitterapiv2.model.recent.data import Data
+
+ROWS = [
+    ("2021-11-14T05:10:00.000Z", "python code #python"),
+    ("2021-11-14T05:50:00.000Z", "python rocks"),
+    ("2021-11-14T06:05:00.000Z", "rust code #rust"),
+    ("2021-11-14T06:30:00.000Z", "rust rocks #rust"),
+    ("2021-11-15T01:00:00.000Z", "rust python"),
+]
+
+
+def _count(rows: List[Tuple[str, str]], buckets: str = "hour") -> CountWords:
+    counter = CountWords(buckets=buckets)
+    for created_at, text in rows:
+        counter.parse_tweet(text, created_at)
+    return counter
+
+
+def test_counts_per_bucket() -> None:
+    counter = _count(ROWS)
+    assert counter.trends is not None
+
+    assert sorted(counter.trends.buckets) == [
+        "2021-11-14T05",
+        "2021-11-14T06",
+        "2021-11-15T01",
+    ]
+    assert counter.trends.counts("2021-11-14T05") == {
+        "python": 2,
+        "code": 1,
+        "rocks": 1,
+        "#python": 1,
+    }
+    # The flat counts are unchanged
+    assert counter.word_count["python"] == 3
+
+    daily = _count(ROWS, "day").trends
+    assert daily is not None
+    assert daily.counts("2021-11-15") == {"rust": 1, "python": 1}
+
+
+def test_movers_between_adjacent_buckets() -> None:
+    trends = _count(ROWS).trends
+    assert trends is not None
+
+    moved = trends.movers(2)
+
+    previous, bucket, risers, fallers = moved[0]
+    assert (previous, bucket) == ("2021-11-14T05", "2021-11-14T06")
+    assert risers == [("rust", 2), ("#rust", 2)]
+    assert fallers == [("python", -2), ("#python", -1)]
+
+    # The quiet hours in between are empty buckets, not skipped
+    assert [pair[:2] for pair in moved[1:]] == [
+        ("2021-11-14T06", "2021-11-14T07"),
+        ("2021-11-15T00", "2021-11-15T01"),
+    ]
+    assert moved[1][2] == []
+    assert moved[1][3] == [("#rust", -2), ("rust", -2)]
+    assert moved[2][2] == [("rust", 1), ("python", 1)]
+    assert moved[2][3] == []
+
+
+def test_merged_shards_match_single_pass(tmp_path: Path) -> None:
+    counters = [_count(ROWS[idx::2]) for idx in range(2)]
+    counters = [pickle.loads(pickle.dumps(counter)) for counter in counters]
+    merged = tree_merge(counters).trends
+    single = _count(ROWS).trends
+    assert merged is not None and single is not None
+
+    for key in single.buckets:
+        assert merged.counts(key) == single.counts(key)
+
+    filename = str(tmp_path / "test.db")
+    tweets = [
+        Data.build_obj({"id": str(idx), "created_at": created, "text": text})
+        for idx, (created, text) in enumerate(ROWS)
+    ]
+    with DataStore(filename).connection() as dbclient:
+        dbclient.insert_rows(tweets)
+    parallel = count_parallel(filename, workers=2, batch_size=2, buckets="hour")
+    assert parallel.trends is not None
+    assert parallel.trends.movers() == single.movers()
+
+
+def test_unknown_width() -> None:
+    with pytest.raises(ValueError):
+        BucketCounts("week")
@@ -0,0 +1,69 @@
+import pickle
+from collections import Counter
+from pathlib import Path
+from typing import List
+
+import pytest
+
+import vocab
+from process import CountWords
+from process import create_wordmap
+from process import tree_merge
+from vocab import TokenCounts
+
+TEXTS = [
+    "python code #python",
+    "Python rocks and python rolls",
+    "learning code today #100DaysOfCode #python",
+    "rust code",
+]
+
+
+@pytest.fixture(params=["numpy", "stdlib"])
+def backend(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> str:
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(vocab, "numpy", None)
+    return str(request.param)
+
+
+def _count(texts: List[str], interned: bool = False) -> CountWords:
+    counter = CountWords(interned=interned)
+    for text in texts:
+        counter.parse_tweet(text)
+    return counter
+
+
+def test_interned_counts_match_counter(backend: str) -> None:
+    exact = _count(TEXTS)
+    interned = _count(TEXTS, interned=True)
+
+    assert isinstance(interned.word_count, TokenCounts)
+    assert interned.word_count == exact.word_count
+    assert dict(interned.hash_count) == exact.hash_count
+    assert interned.word_count.above(50) == {"python": 3, "code": 3}
+
+
+def test_small_flush_and_merge(backend: str) -> None:
+    counters = []
+    for text in TEXTS:
+        counter = CountWords(interned=True)
+        counter.word_count = TokenCounts(flush_size=2)
+        counter.parse_tweet(text)
+        counters.append(pickle.loads(pickle.dumps(counter)))
+
+    merged = tree_merge(counters)
+
+    assert merged.word_count == Counter(_count(TEXTS).word_count)
+
+
+def test_create_wordmap_output_matches(tmp_path: Path) -> None:
+    exact = _count(TEXTS * 3)
+    interned = _count(TEXTS * 3, interned=True)
+
+    create_wordmap(str(tmp_path / "exact.html"), exact.word_count, 40)
+    create_wordmap(str(tmp_path / "interned.html"), interned.word_count, 40)
+
+    exact_html = (tmp_path / "exact.html").read_text()
+    assert exact_html == (tmp_path / "interned.html").read_text()
@@ -0,0 +1,71 @@
+"""
+Precompiled tokenizer for splitting tweets into countable words and hashtags
+"""
+import re
+from string import ascii_letters
+from typing import AbstractSet
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+
+from skipwords import skip_words
+
+# Longest word (or hashtag) that will be counted
+MAX_WORD_LENGTH = 42
+
+_UNICODE_ESCAPE = re.compile(r"\\u[a-z|0-9]{4}")
+_URL_PREFIX = ("http://", "https://")
+_VALID_START = frozenset(ascii_letters + "#")
+_VALID_END = frozenset(ascii_letters)
+
+
+class Tokens(NamedTuple):
+    words: List[str]
+    hashtags: List[str]
+    skipped: int
+
+
+class Tokenizer:
+    """
+    Extracts valid words and hashtags from tweet text in a single pass
+
+    Rules:
+        Retweets (text starting with "RT ") are ignored entirely
+        Escaped unicode sequences (\\uXXXX) are removed
+        Words longer than MAX_WORD_LENGTH are skipped
+        Links (http:// or https://) are skipped
+        Words must start with an ascii letter (or #) and end with an ascii letter
+        Words found in `skip_words` are skipped
+    """
+
+    def __init__(self, skip: Optional[AbstractSet[str]] = None) -> None:
+        self.skip = frozenset(skip_words if skip is None else skip)
+
+    def tokenize(self, text: str) -> Tokens:
+        """Split text into valid words, hashtags, and a count of skipped words"""
+        words: List[str] = []
+        hashtags: List[str] = []
+        skipped = 0
+
+        if text.startswith("RT "):
+            return Tokens(words, hashtags, skipped)
+
+        if "\\u" in text:
+            text = _UNICODE_ESCAPE.sub("", text)
+
+        skip = self.skip
+        for word in text.lower().split():
+            if (
+                len(word) > MAX_WORD_LENGTH
+                or word[0] not in _VALID_START
+                or word[-1] not in _VALID_END
+                or word.startswith(_URL_PREFIX)
+                or word in skip
+            ):
+                skipped += 1
+            elif word[0] == "#":
+                hashtags.append(word)
+            else:
+                words.append(word)
+
+        return Tokens(words, hashtags, skipped)
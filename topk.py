@@ -0,0 +1,81 @@
+"""
+Memory-bounded approximate counting of the most frequent words
+"""
+from heapq import nlargest
+from typing import Any
+from typing import Counter
+from typing import Mapping
+from typing import Sized
+from typing import Tuple
+
+
+class TopKCounter(Counter[str]):
+    """
+    Counter that keeps at most `2 * capacity` words (Misra-Gries summary)
+
+    When the counter grows past its budget it is pruned to the `capacity`
+    largest counts: the (capacity + 1)th largest count is subtracted from every
+    count, and words left at zero are dropped. Kept counts are therefore lower
+    bounds. `.error` is the most any kept count can be below its true count,
+    and never exceeds `total_count / (capacity + 1)`. Any word that occurs more
+    than `.error` times is guaranteed to be kept.
+
+    Summaries merge with `.update(other)`, keeping the same bound.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        if capacity < 1:
+            raise ValueError("capacity must be 1 or greater.")
+        self.capacity = capacity
+        self.total_count = 0
+        self.error = 0
+        super().__init__()
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        # Counter pickles as a plain mapping, which loses capacity and error
+        items = iter(self.items())
+        return (self.__class__, (self.capacity,), self.__dict__, None, items)
+
+    def copy(self) -> "TopKCounter":
+        new = TopKCounter(self.capacity)
+        new.__dict__.update(self.__dict__)
+        dict.update(new, self)
+        return new
+
+    def update(self, *args: Any, **kwds: int) -> None:
+        """Count an iterable of words, or add the counts of a mapping"""
+        for arg in args:
+            if arg is None:
+                continue
+            if isinstance(arg, TopKCounter):
+                self.total_count += arg.total_count
+                self.error += arg.error
+            elif isinstance(arg, Mapping):
+                self.total_count += sum(arg.values())
+            else:
+                if not isinstance(arg, Sized):
+                    arg = list(arg)
+                self.total_count += len(arg)
+            super().update(arg)
+        if kwds:
+            self.total_count += sum(kwds.values())
+            super().update(**kwds)
+        if len(self) > 2 * self.capacity:
+            self.prune()
+
+    def prune(self) -> None:
+        """Reduce to at most `capacity` words"""
+        if len(self) <= self.capacity:
+            return
+        threshold = nlargest(self.capacity + 1, self.values())[-1]
+        kept = {
+            word: count - threshold for word, count in self.items() if count > threshold
+        }
+        self.clear()
+        dict.update(self, kept)
+        self.error += threshold
+
+    @property
+    def error_bound(self) -> float:
+        """Guaranteed ceiling of `.error`, from the number of words counted"""
+        return self.total_count / (self.capacity + 1)
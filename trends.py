@@ -0,0 +1,113 @@
+"""
+Word counts per time bucket, and the words that moved most between buckets
+"""
+import heapq
+from datetime import datetime
+from datetime import timedelta
+from operator import itemgetter
+from typing import Counter
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Tuple
+
+from vocab import Vocabulary
+
+# Length of the ISO 8601 created_at prefix that names each bucket
+BUCKET_WIDTHS = {"hour": 13, "day": 10}
+# strptime format of a bucket name, and the step to the next bucket
+BUCKET_STEPS = {
+    "hour": ("%Y-%m-%dT%H", timedelta(hours=1)),
+    "day": ("%Y-%m-%d", timedelta(days=1)),
+}
+
+Movers = List[Tuple[str, int]]
+
+
+class BucketCounts:
+    """
+    Counts of words for each hour or day of `created_at`
+
+    Buckets share one Vocabulary and count ids in a sparse Counter, so each
+    word is stored once however many buckets it appears in. Buckets are named
+    by the matching created_at prefix, "2021-11-14T05" or "2021-11-14".
+    """
+
+    def __init__(self, width: str = "hour") -> None:
+        if width not in BUCKET_WIDTHS:
+            raise ValueError(f"width must be one of {', '.join(BUCKET_WIDTHS)}.")
+        self.width = width
+        self.vocabulary = Vocabulary()
+        self.buckets: Dict[str, Counter[int]] = {}
+
+    def update(self, created_at: str, words: Iterable[str]) -> None:
+        """Count words in the bucket of `created_at`"""
+        key = created_at[: BUCKET_WIDTHS[self.width]]
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = Counter()
+        bucket.update(map(self.vocabulary.__getitem__, words))
+
+    def merge(self, other: "BucketCounts") -> "BucketCounts":
+        """Add the buckets of another BucketCounts, remapping its ids"""
+        if other.width != self.width:
+            raise ValueError("Cannot merge buckets of different widths.")
+        remap = [self.vocabulary[word] for word in other.vocabulary.words]
+        for key, counts in other.buckets.items():
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                bucket = self.buckets[key] = Counter()
+            for idx, count in counts.items():
+                bucket[remap[idx]] += count
+        return self
+
+    def counts(self, key: str) -> Dict[str, int]:
+        """Word counts of one bucket"""
+        words = self.vocabulary.words
+        return {words[idx]: count for idx, count in self.buckets[key].items()}
+
+    def keys(self) -> Iterator[str]:
+        """Every bucket name from the first to the last, including empty ones"""
+        if not self.buckets:
+            return
+        fmt, step = BUCKET_STEPS[self.width]
+        current = datetime.strptime(min(self.buckets), fmt)
+        last = datetime.strptime(max(self.buckets), fmt)
+        while current <= last:
+            yield current.strftime(fmt)
+            current += step
+
+    def movers(self, size: int = 10) -> List[Tuple[str, str, Movers, Movers]]:
+        """
+        Compare each hour or day with the one before it, in time order. Hours
+        or days without tweets count as empty buckets; a pair where both are
+        empty is left out.
+
+        Returns (previous, bucket, risers, fallers) per pair, with the `size`
+        largest gains and losses as (word, change).
+        """
+        words = self.vocabulary.words
+        empty: Counter[int] = Counter()
+        keys = list(self.keys())
+        moved = []
+        for previous, key in zip(keys, keys[1:]):
+            before = self.buckets.get(previous, empty)
+            after = self.buckets.get(key, empty)
+            if not before and not after:
+                continue
+            deltas = [
+                (words[idx], after[idx] - before[idx]) for idx in before.keys() | after
+            ]
+            # Ties are broken by word so merged shards report the same movers
+            risers = heapq.nlargest(size, deltas, key=itemgetter(1, 0))
+            fallers = heapq.nsmallest(size, deltas, key=itemgetter(1, 0))
+            moved.append(
+                (
+                    previous,
+                    key,
+                    [(word, delta) for word, delta in risers if delta > 0],
+                    [(word, delta) for word, delta in fallers if delta < 0],
+                )
+            )
+        return moved
@@ -0,0 +1,145 @@
+"""
+Append-only archive of raw API responses
+
+Every successful response body is kept as the API sent it, with the request
+fields and rate-limit headers it came with. A DataStore can be rebuilt from
+the archive, or store more of each tweet, without spending request quota.
+
+File layout: the MAGIC line, then one frame per response. A frame is a 4 byte
+big-endian length followed by that many bytes of zlib compressed record. A
+record is a 4 byte big-endian length, that many bytes of JSON metadata, and the
+response body.
+"""
+import json
+import logging
+import os
+import struct
+import time
+import zlib
+from threading import Lock
+from typing import Any
+from typing import Dict
+from typing import Iterator
+from typing import NamedTuple
+from typing import Optional
+
+from twitterapiv2.model.responseheader import ResponseHeader
+
+MAGIC = b"twwordmap-archive 1\n"
+
+_LENGTH = struct.Struct(">I")
+
+log = logging.getLogger(__name__)
+
+
+class ArchiveRecord(NamedTuple):
+    """One archived response"""
+
+    url: str
+    fields: Dict[str, Any]
+    received_at: float
+    rate_limit_limit: str
+    rate_limit_remaining: str
+    rate_limit_reset: str
+    body: bytes
+
+
+class Archive:
+    """
+    Compressed, append-only file of response bodies
+
+    Each response is compressed on its own and written with a single append,
+    so a crash can only lose the frame being written. Reading stops at a
+    truncated final frame, and the first append of an Archive cuts such a
+    frame off so later frames are not read as part of it.
+    """
+
+    def __init__(self, filename: str) -> None:
+        self.filename = filename
+        self._lock = Lock()
+        self._checked = False
+
+    def append(
+        self,
+        url: str,
+        fields: Dict[str, Any],
+        header: ResponseHeader,
+        body: bytes,
+        received_at: Optional[float] = None,
+    ) -> None:
+        """Add a response to the end of the archive"""
+        meta = {
+            "url": url,
+            "fields": {key: val for key, val in fields.items() if val is not None},
+            "received_at": time.time() if received_at is None else received_at,
+            "rate_limit_limit": header.x_rate_limit_limit,
+            "rate_limit_remaining": header.x_rate_limit_remaining,
+            "rate_limit_reset": header.x_rate_limit_reset,
+        }
+        encoded = json.dumps(meta, separators=(",", ":")).encode()
+        frame = zlib.compress(_LENGTH.pack(len(encoded)) + encoded + body)
+        with self._lock:
+            if not self._checked:
+                self._drop_torn_frame()
+                self._checked = True
+            with open(self.filename, "ab") as outfile:
+                # An empty file, made by touch or a crash, still needs MAGIC
+                if os.fstat(outfile.fileno()).st_size == 0:
+                    outfile.write(MAGIC)
+                outfile.write(_LENGTH.pack(len(frame)) + frame)
+
+    def __iter__(self) -> Iterator[ArchiveRecord]:
+        """
+        Read the records back in the order they were written
+
+        Raises ValueError on a complete frame that cannot be decoded.
+        """
+        with open(self.filename, "rb") as infile:
+            if infile.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"'{self.filename}' is not a response archive.")
+            while True:
+                offset = infile.tell()
+                prefix = infile.read(_LENGTH.size)
+                if len(prefix) < _LENGTH.size:
+                    break
+                (size,) = _LENGTH.unpack(prefix)
+                frame = infile.read(size)
+                if len(frame) < size:
+                    break
+                try:
+                    record = zlib.decompress(frame)
+                    (meta_size,) = _LENGTH.unpack_from(record)
+                    end = _LENGTH.size + meta_size
+                    meta = json.loads(record[_LENGTH.size : end])
+                except (zlib.error, struct.error, ValueError) as err:
+                    raise ValueError(
+                        f"Corrupt frame at byte {offset} of '{self.filename}'."
+                    ) from err
+                yield ArchiveRecord(body=record[end:], **meta)
+
+    def _drop_torn_frame(self) -> None:
+        """Truncate a final frame left incomplete by a crash"""
+        try:
+            infile = open(self.filename, "rb")
+        except FileNotFoundError:
+            return
+        with infile:
+            total = os.fstat(infile.fileno()).st_size
+            head = infile.read(len(MAGIC))
+            if head != MAGIC:
+                if MAGIC.startswith(head):
+                    # Even the header was cut short, start the file again
+                    end = 0
+                else:
+                    raise ValueError(f"'{self.filename}' is not a response archive.")
+            else:
+                end = len(MAGIC)
+                while end + _LENGTH.size <= total:
+                    infile.seek(end)
+                    (size,) = _LENGTH.unpack(infile.read(_LENGTH.size))
+                    if end + _LENGTH.size + size > total:
+                        break
+                    end += _LENGTH.size + size
+        if end < total:
+            log.warning("Dropping a torn frame from the end of '%s'", self.filename)
+            os.truncate(self.filename, end)
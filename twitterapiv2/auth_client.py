@@ -6,9 +6,11 @@ https://developer.twitter.com/en/docs/authentication/oauth-2-0/application-only
 import logging
 import os
 from base64 import b64encode
+from typing import Optional
 from urllib import parse
 
 from twitterapiv2.http import Http
+from twitterapiv2.http import Pool
 
 
 class AuthClient(Http):
@@ -25,9 +27,9 @@ class AuthClient(Http):
 
     TWITTER_API = "https://api.twitter.com"
 
-    def __init__(self) -> None:
+    def __init__(self, *, pool: Optional[Pool] = None) -> None:
         self.log = logging.getLogger(__name__)
-        self.http = super().connection()
+        self.http = pool if pool is not None else super().connection()
 
     def encoded_credentials(self) -> str:
         """Creates an encoded bear token credential string"""
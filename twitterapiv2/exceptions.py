@@ -5,3 +5,7 @@ class InvalidResponseError(Exception):
 
 class ThrottledError(Exception):
     ...
+
+
+class CassetteMissError(Exception):
+    ...
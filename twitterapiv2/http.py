@@ -1,15 +1,33 @@
 import json
 import logging
+import time
 from datetime import datetime
 from typing import Any
+from typing import Callable
 from typing import Dict
 from typing import Optional
+from typing import Union
 
 import urllib3
 
+from twitterapiv2.archive import Archive
 from twitterapiv2.exceptions import InvalidResponseError
 from twitterapiv2.exceptions import ThrottledError
+from twitterapiv2.metrics import Metrics
 from twitterapiv2.model.responseheader import ResponseHeader
+from twitterapiv2.rate_limiter import RateLimiter
+from twitterapiv2.transport import Transport
+
+# Parses response bodies, uses orjson when installed
+try:
+    import orjson
+
+    json_loads: Callable[[Union[bytes, str]], Any] = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
+# A connection pool, or a transport standing in for one
+Pool = Union[urllib3.PoolManager, Transport]
 
 
 class Http:
@@ -21,9 +39,37 @@ class Http:
         InvalidResponseError - Raised on all other failed status codes
     """
 
-    def __init__(self, num_pools: int = 10) -> None:
+    def __init__(
+        self,
+        num_pools: int = 10,
+        *,
+        pool: Optional[Pool] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        stream: bool = False,
+        metrics: Optional[Metrics] = None,
+        archive: Optional[Archive] = None,
+    ) -> None:
+        """
+        Provide `pool` to share an existing connection pool (see Session), or
+        a record/replay transport (see twitterapiv2.transport)
+
+        When a `rate_limiter` is given, `.get()` waits on it before each request
+
+        With `stream` the response body is not preloaded by urllib3; it is read
+        once and parsed straight from bytes before the connection is released.
+
+        With `metrics`, request latency, response size, retries and failed
+        responses are recorded for every request.
+
+        With an `archive`, the raw body of every successful response is appended
+        to it along with the request fields and rate-limit headers.
+        """
         self.log = logging.getLogger(__name__)
-        self.http = self.connection(num_pools)
+        self.http = pool if pool is not None else self.connection(num_pools)
+        self.rate_limiter = rate_limiter
+        self.stream = stream
+        self.metrics = metrics
+        self.archive = archive
         self._last_response: Optional[ResponseHeader] = None
 
     @property
@@ -43,10 +89,27 @@ class Http:
             ts = int(self._last_response.x_rate_limit_reset)
             return datetime.utcfromtimestamp(ts)
 
-    def connection(self, num_pools: int = 10) -> urllib3.PoolManager:
+    @property
+    def connection_stats(self) -> Dict[str, int]:
+        """Requests sent and connections opened across the pool's hosts"""
+        requests = connections = 0
+        for key in list(self.http.pools.keys()):
+            host_pool = self.http.pools.get(key)
+            if host_pool is None:
+                continue
+            requests += host_pool.num_requests
+            connections += host_pool.num_connections
+        return {
+            "requests": requests,
+            "connections": connections,
+            "reused": max(requests - connections, 0),
+        }
+
+    def connection(self, num_pools: int = 10, maxsize: int = 1) -> urllib3.PoolManager:
         """Returns HTTP pool manager with retries and backoff"""
         return urllib3.PoolManager(
             num_pools=num_pools,
+            maxsize=maxsize,
             retries=urllib3.Retry(
                 total=3,
                 backoff_factor=2,
@@ -58,10 +121,10 @@ class Http:
         )
 
     def _data2dict(self, data: bytes) -> Dict[str, Any]:
-        """Converts response data to a dict"""
+        """Converts response data to a dict, uses orjson when installed"""
         try:
-            return json.loads(data.decode("utf-8"))
-        except json.JSONDecodeError as err:
+            return json_loads(data)
+        except ValueError as err:
             self.log.error("Error converting data to dict: '%s'", err)
             return {"error": data}
 
@@ -72,10 +135,32 @@ class Http:
         headers: Dict[str, Any],
     ) -> Dict[str, Any]:
         """Override for specific implementations"""
-        resp = self.http.request("GET", url, fields, headers)
-        self._last_response = ResponseHeader.build_from(resp)
-        self.__raise_on_response(resp, url)
-        return self._data2dict(resp.data)
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        start = time.perf_counter()
+        resp = self.http.request(
+            "GET",
+            url,
+            fields=fields,
+            headers=headers,
+            preload_content=not self.stream,
+        )
+        try:
+            self._last_response = ResponseHeader.build_from(resp)
+            if self.rate_limiter is not None:
+                self.rate_limiter.update(self._last_response, resp.status)
+            self.__raise_on_response(resp, url)
+            data = resp.data
+            if self.metrics is not None:
+                elapsed = time.perf_counter() - start
+                self.metrics.observe("http_request_seconds", elapsed)
+                self.metrics.observe("http_response_bytes", len(data))
+            if self.archive is not None:
+                self.archive.append(url, fields, self._last_response, data)
+            return self._data2dict(data)
+        finally:
+            if self.stream:
+                resp.release_conn()
 
     def post(self) -> None:
         """Override for specific implementations"""
@@ -93,8 +178,19 @@ class Http:
         """Override for specific implementations"""
         raise NotImplementedError
 
+    def _record_response(self, resp: Any) -> None:
+        """Count retries and failed responses"""
+        if self.metrics is None:
+            return
+        retries = getattr(resp, "retries", None)
+        if retries is not None and retries.history:
+            self.metrics.increment("http_retries", len(retries.history))
+        if resp.status not in range(200, 300):
+            self.metrics.increment(f"http_errors_{resp.status}")
+
     def __raise_on_response(self, resp: Any, url: str) -> None:
         """Custom handling of invalid status codes"""
+        self._record_response(resp)
         if resp.status == 429:
             raise ThrottledError(f"Throttled until {self.limit_reset}")
         if resp.status not in range(200, 300):
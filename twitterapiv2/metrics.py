@@ -0,0 +1,164 @@
+"""
+Timing histograms and counters for the stages of a collection run
+"""
+import bisect
+import json
+import threading
+from pathlib import Path
+from threading import Lock
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Sequence
+
+# Upper bounds of the histogram buckets, values above the last go in +Inf
+SECONDS_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 60, 300)
+BYTES_BUCKETS = (1_024, 4_096, 16_384, 32_768, 65_536, 131_072, 524_288, 1_048_576)
+# Prefix of every metric name in the Prometheus text format
+PROMETHEUS_PREFIX = "twwordmap_"
+
+Hook = Callable[[str, float], None]
+
+
+class Histogram:
+    """Counts of observed values per bucket, with their sum, min and max"""
+
+    def __init__(self, buckets: Sequence[float] = SECONDS_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Summary with per-bucket (not cumulative) counts"""
+        bounds = [str(bound) for bound in self.buckets] + ["+Inf"]
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "mean": round(self.sum / self.count, 6) if self.count else None,
+            "min": self.min,
+            "max": self.max,
+            "buckets": dict(zip(bounds, self.counts)),
+        }
+
+
+class Metrics:
+    """
+    Thread safe registry of histograms and counters
+
+    Histograms are created on first `.observe()`; names ending in `_bytes` get
+    byte sized buckets, all others are timings in seconds. Hooks added with
+    `.add_hook()` are called with every observed name and value.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._hooks: List[Hook] = []
+        self.histograms: Dict[str, Histogram] = {}
+        self.counters: Dict[str, float] = {}
+
+    def add_hook(self, hook: Hook) -> None:
+        """Call `hook(name, value)` for every observation and increment"""
+        self._hooks.append(hook)
+
+    def observe(self, name: str, value: float) -> None:
+        """Record a value in the named histogram"""
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                buckets = BYTES_BUCKETS if name.endswith("_bytes") else SECONDS_BUCKETS
+                histogram = self.histograms[name] = Histogram(buckets)
+            histogram.observe(value)
+        for hook in self._hooks:
+            hook(name, value)
+
+    def increment(self, name: str, value: float = 1) -> None:
+        """Add to the named counter"""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+        for hook in self._hooks:
+            hook(name, value)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current counters and histogram summaries"""
+        with self._lock:
+            return {
+                "counters": dict(self.counters),
+                "histograms": {
+                    name: histogram.as_dict()
+                    for name, histogram in self.histograms.items()
+                },
+            }
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition format, counters get a `_total` suffix"""
+        lines: List[str] = []
+        with self._lock:
+            for name, value in sorted(self.counters.items()):
+                metric = f"{PROMETHEUS_PREFIX}{name}_total"
+                lines.append(f"# TYPE {metric} counter")
+                lines.append(f"{metric} {value}")
+            for name, histogram in sorted(self.histograms.items()):
+                metric = f"{PROMETHEUS_PREFIX}{name}"
+                lines.append(f"# TYPE {metric} histogram")
+                cumulative = 0
+                bounds = [str(bound) for bound in histogram.buckets] + ["+Inf"]
+                for bound, count in zip(bounds, histogram.counts):
+                    cumulative += count
+                    lines.append(f'{metric}_bucket{{le="{bound}"}} {cumulative}')
+                lines.append(f"{metric}_sum {histogram.sum}")
+                lines.append(f"{metric}_count {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def dump(self, filename: str) -> None:
+        """Write to file, Prometheus format for a `.prom` file, JSON otherwise"""
+        path = Path(filename)
+        if path.suffix == ".prom":
+            output = self.to_prometheus()
+        else:
+            output = self.to_json() + "\n"
+        # Write then rename so a scraper never reads a partial file
+        temp = path.with_name(path.name + ".tmp")
+        temp.write_text(output, encoding="utf-8")
+        temp.replace(path)
+
+
+class PeriodicDump:
+    """Context manager dumping `metrics` every `interval` seconds, and on exit"""
+
+    def __init__(self, metrics: Metrics, filename: str, interval: float) -> None:
+        self.metrics = metrics
+        self.filename = filename
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "PeriodicDump":
+        if self.interval > 0:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.metrics.dump(self.filename)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.metrics.dump(self.filename)
@@ -0,0 +1,92 @@
+"""
+Descriptors that decode nested sections of a model on first access
+
+The owning class must define `__slots__` containing `_raw` (the source dict)
+and `_<name>` for each lazy attribute, where the decoded value is cached.
+"""
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Generic
+from typing import List
+from typing import Optional
+from typing import overload
+from typing import TypeVar
+from typing import Union
+
+T = TypeVar("T")
+
+
+class LazyModel(Generic[T]):
+    """Nested object, built with `build` when present in the raw dict"""
+
+    def __init__(self, build: Callable[[Dict[str, Any]], T]) -> None:
+        self.build = build
+        self.key = ""
+        self.slot = ""
+
+    def __set_name__(self, owner: Any, name: str) -> None:
+        self.key = name
+        self.slot = f"_{name}"
+
+    @overload
+    def __get__(self, obj: None, owner: Any = None) -> "LazyModel[T]":
+        ...
+
+    @overload
+    def __get__(self, obj: object, owner: Any = None) -> Optional[T]:
+        ...
+
+    def __get__(
+        self, obj: Optional[object], owner: Any = None
+    ) -> Union["LazyModel[T]", Optional[T]]:
+        if obj is None:
+            return self
+        try:
+            return getattr(obj, self.slot)
+        except AttributeError:
+            pass
+        content = getattr(obj, "_raw").get(self.key)
+        value = self.build(content) if content else None
+        setattr(obj, self.slot, value)
+        return value
+
+    def __set__(self, obj: object, value: Optional[T]) -> None:
+        setattr(obj, self.slot, value)
+
+
+class LazyModelList(Generic[T]):
+    """Nested array of objects, each built with `build`"""
+
+    def __init__(self, build: Callable[[Dict[str, Any]], T]) -> None:
+        self.build = build
+        self.key = ""
+        self.slot = ""
+
+    def __set_name__(self, owner: Any, name: str) -> None:
+        self.key = name
+        self.slot = f"_{name}"
+
+    @overload
+    def __get__(self, obj: None, owner: Any = None) -> "LazyModelList[T]":
+        ...
+
+    @overload
+    def __get__(self, obj: object, owner: Any = None) -> List[T]:
+        ...
+
+    def __get__(
+        self, obj: Optional[object], owner: Any = None
+    ) -> Union["LazyModelList[T]", List[T]]:
+        if obj is None:
+            return self
+        try:
+            return getattr(obj, self.slot)
+        except AttributeError:
+            pass
+        value = [self.build(x) for x in getattr(obj, "_raw").get(self.key, [])]
+        setattr(obj, self.slot, value)
+        return value
+
+    def __set__(self, obj: object, value: List[T]) -> None:
+        setattr(obj, self.slot, value)
@@ -3,6 +3,8 @@ from typing import Dict
 
 
 class Annotations:
+    __slots__ = ("start", "end", "probability", "type", "normalized_text")
+
     start: int
     end: int
     probability: float
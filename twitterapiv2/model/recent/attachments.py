@@ -4,6 +4,8 @@ from typing import List
 
 
 class Attachments:
+    __slots__ = ("media_keys", "poll_id")
+
     media_keys: List[Any]
     poll_id: List[Any]
 
@@ -3,6 +3,8 @@ from typing import Dict
 
 
 class Cashtags:
+    __slots__ = ("start", "end", "tag")
+
     start: int
     end: int
     tag: str
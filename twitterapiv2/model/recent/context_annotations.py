@@ -7,6 +7,8 @@ from twitterapiv2.model.recent.entity import Entity
 
 
 class ContextAnnotations:
+    __slots__ = ("domain", "entity")
+
     domain: Optional[Domain]
     entity: Optional[Entity]
 
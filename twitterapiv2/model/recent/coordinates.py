@@ -4,6 +4,8 @@ from typing import List
 
 
 class Coordinates:
+    __slots__ = ("type", "coordinates")
+
     type: str
     coordinates: List[float]
 
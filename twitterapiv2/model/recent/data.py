@@ -1,8 +1,10 @@
+from typing import AbstractSet
 from typing import Any
 from typing import Dict
-from typing import List
 from typing import Optional
 
+from twitterapiv2.model.lazy import LazyModel
+from twitterapiv2.model.lazy import LazyModelList
 from twitterapiv2.model.recent.attachments import Attachments
 from twitterapiv2.model.recent.context_annotations import ContextAnnotations
 from twitterapiv2.model.recent.entities import Entities
@@ -15,69 +17,122 @@ from twitterapiv2.model.recent.public_metrics import PublicMetrics
 from twitterapiv2.model.recent.referenced_tweets import ReferencedTweets
 from twitterapiv2.model.recent.withheld import Withheld
 
+_PLAIN_FIELDS = frozenset(
+    (
+        "created_at",
+        "author_id",
+        "conversation_id",
+        "in_reply_to_user_id",
+        "possibly_sensitive",
+        "lang",
+        "reply_settings",
+        "source",
+    )
+)
+_NESTED_FIELDS = frozenset(
+    (
+        "referenced_tweets",
+        "attachments",
+        "geo",
+        "context_annotations",
+        "entities",
+        "withheld",
+        "public_metrics",
+        "non_public_metrics",
+        "organic_metrics",
+        "promoted_metrics",
+        "includes",
+    )
+)
+
 
 class Data:
-    """Defines an empty Data object"""
+    """
+    Defines an empty Data object
+
+    Nested sections are decoded from the source dict on first access
+    """
+
+    __slots__ = (
+        "_raw",
+        "id",
+        "text",
+        "created_at",
+        "author_id",
+        "conversation_id",
+        "in_reply_to_user_id",
+        "possibly_sensitive",
+        "lang",
+        "reply_settings",
+        "source",
+        "_referenced_tweets",
+        "_attachments",
+        "_geo",
+        "_context_annotations",
+        "_entities",
+        "_withheld",
+        "_public_metrics",
+        "_non_public_metrics",
+        "_organic_metrics",
+        "_promoted_metrics",
+        "_includes",
+    )
 
+    _raw: Dict[str, Any]
     id: str
     text: str
     created_at: Optional[str]
     author_id: Optional[str]
     conversation_id: Optional[str]
     in_reply_to_user_id: Optional[str]
-    referenced_tweets: List[ReferencedTweets]
-    attachments: Optional[Attachments]
-    geo: Optional[Geo]
-    context_annotations: Optional[ContextAnnotations]
-    entities: Optional[Entities]
-    withheld: Optional[Withheld]
-    public_metrics: Optional[PublicMetrics]
-    non_public_metrics: Optional[NonPublicMetrics]
-    organic_metrics: Optional[OrganicMetrics]
-    promoted_metrics: Optional[PromotedMetrics]
     possibly_sensitive: Optional[bool]
     lang: Optional[str]
     reply_settings: Optional[str]
     source: Optional[str]
-    includes: Optional[Includes]
+
+    referenced_tweets = LazyModelList(ReferencedTweets.build_obj)
+    attachments = LazyModel(Attachments.build_obj)
+    geo = LazyModel(Geo.build_obj)
+    context_annotations = LazyModel(ContextAnnotations.build_obj)
+    entities = LazyModel(Entities.build_obj)
+    withheld = LazyModel(Withheld.build_obj)
+    public_metrics = LazyModel(PublicMetrics.build_obj)
+    non_public_metrics = LazyModel(NonPublicMetrics.build_obj)
+    organic_metrics = LazyModel(OrganicMetrics.build_obj)
+    promoted_metrics = LazyModel(PromotedMetrics.build_obj)
+    includes = LazyModel(Includes.build_obj)
 
     @classmethod
-    def build_obj(cls, obj: Dict[str, Any]) -> "Data":
-        """Builds object from dictionary"""
+    def build_obj(
+        cls,
+        obj: Dict[str, Any],
+        fields: Optional[AbstractSet[str]] = None,
+    ) -> "Data":
+        """
+        Builds object from dictionary
+
+        When `fields` is given only those fields (plus `id` and `text`) are
+        built. Other nested sections and plain attributes read as None.
+        """
         tweet = cls()
         tweet.id = obj["id"]
         tweet.text = obj["text"]
+        if fields is not None:
+            return tweet._project(obj, fields)
+        tweet._raw = obj
         tweet.created_at = obj.get("created_at")
         tweet.author_id = obj.get("author_id")
         tweet.conversation_id = obj.get("conversation_id")
         tweet.in_reply_to_user_id = obj.get("in_reply_to_user_id")
         tweet.possibly_sensitive = obj.get("possibly_sensitive")
         tweet.lang = obj.get("lang")
-        tweet.reply_settings = obj.get("replay_settings")
+        tweet.reply_settings = obj.get("reply_settings")
         tweet.source = obj.get("source")
-
-        # Process nested arrays
-        nested_array: Dict[str, Any] = {
-            "referenced_tweets": ReferencedTweets,
-        }
-        for key, model in nested_array.items():
-            setattr(tweet, key, [model.build_obj(x) for x in obj.get(key, [])])
-
-        # Process Nested Objects
-        nested_obj: Dict[str, Any] = {
-            "attachments": Attachments,
-            "geo": Geo,
-            "context_annotations": ContextAnnotations,
-            "entities": Entities,
-            "withheld": Withheld,
-            "public_metrics": PublicMetrics,
-            "non_public_metrics": NonPublicMetrics,
-            "organic_metrics": OrganicMetrics,
-            "promoted_metrics": PromotedMetrics,
-            "includes": Includes,
-        }
-        for key, model in nested_obj.items():
-            content = obj.get(key)
-            setattr(tweet, key, model.build_obj(content) if content else None)
-
         return tweet
+
+    def _project(self, obj: Dict[str, Any], fields: AbstractSet[str]) -> "Data":
+        """Set only the requested fields, keeping just their part of the source"""
+        self._raw = {key: obj[key] for key in fields & _NESTED_FIELDS if key in obj}
+        for key in _PLAIN_FIELDS:
+            setattr(self, key, obj.get(key) if key in fields else None)
+        return self
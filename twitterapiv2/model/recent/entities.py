@@ -1,7 +1,7 @@
 from typing import Any
 from typing import Dict
-from typing import List
 
+from twitterapiv2.model.lazy import LazyModelList
 from twitterapiv2.model.recent.annotations import Annotations
 from twitterapiv2.model.recent.cashtags import Cashtags
 from twitterapiv2.model.recent.hashtags import Hashtags
@@ -10,19 +10,25 @@ from twitterapiv2.model.recent.urls import Urls
 
 
 class Entities:
-    annotations: List[Annotations]
-    urls: List[Urls]
-    hashtags: List[Hashtags]
-    mentions: List[Mentions]
-    cashtags: List[Cashtags]
+    __slots__ = (
+        "_raw",
+        "_annotations",
+        "_urls",
+        "_hashtags",
+        "_mentions",
+        "_cashtags",
+    )
+
+    _raw: Dict[str, Any]
+    annotations = LazyModelList(Annotations.build_obj)
+    urls = LazyModelList(Urls.build_obj)
+    hashtags = LazyModelList(Hashtags.build_obj)
+    mentions = LazyModelList(Mentions.build_obj)
+    cashtags = LazyModelList(Cashtags.build_obj)
 
     @classmethod
     def build_obj(cls, obj: Dict[str, Any]) -> "Entities":
-        """Build object"""
+        """Build object, lists are decoded on first access"""
         new = cls()
-        new.annotations = [Annotations.build_obj(o) for o in obj.get("annotations", [])]
-        new.urls = [Urls.build_obj(o) for o in obj.get("urls", [])]
-        new.hashtags = [Hashtags.build_obj(o) for o in obj.get("hashtags", [])]
-        new.mentions = [Mentions.build_obj(o) for o in obj.get("mentions", [])]
-        new.cashtags = [Cashtags.build_obj(o) for o in obj.get("cashtags", [])]
+        new._raw = obj
         return new
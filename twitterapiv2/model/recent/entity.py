@@ -3,6 +3,8 @@ from typing import Dict
 
 
 class Entity:
+    __slots__ = ("id", "name", "description")
+
     id: str
     name: str
     description: str
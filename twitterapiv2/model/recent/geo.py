@@ -6,6 +6,8 @@ from twitterapiv2.model.recent.coordinates import Coordinates
 
 
 class Geo:
+    __slots__ = ("coordinates", "place_id")
+
     coordinates: Optional[Coordinates]
     place_id: str
 
@@ -4,6 +4,8 @@ from typing import List
 
 
 class Includes:
+    __slots__ = ("tweets", "users", "places", "media", "polls")
+
     tweets: List[Any]
     users: List[Any]
     places: List[Any]
@@ -3,6 +3,8 @@ from typing import Dict
 
 
 class Mentions:
+    __slots__ = ("start", "end", "username")
+
     start: int
     end: int
     username: str
@@ -4,6 +4,8 @@ from typing import Optional
 
 
 class Meta:
+    __slots__ = ("count", "newest_id", "oldest_id", "next_token", "previous_token")
+
     count: int
     newest_id: int
     oldest_id: int
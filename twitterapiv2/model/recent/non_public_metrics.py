@@ -3,6 +3,8 @@ from typing import Dict
 
 
 class NonPublicMetrics:
+    __slots__ = ("impression_count", "url_link_click", "user_profile_click")
+
     impression_count: int
     url_link_click: int
     user_profile_click: int
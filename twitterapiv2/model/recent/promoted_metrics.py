@@ -3,6 +3,15 @@ from typing import Dict
 
 
 class PromotedMetrics:
+    __slots__ = (
+        "impression_count",
+        "url_link_click",
+        "user_profile_click",
+        "retweet_count",
+        "reply_count",
+        "like_count",
+    )
+
     impression_count: int
     url_link_click: int
     user_profile_click: int
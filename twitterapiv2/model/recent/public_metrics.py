@@ -3,6 +3,8 @@ from typing import Dict
 
 
 class PublicMetrics:
+    __slots__ = ("retweet_count", "reply_count", "like_count", "quote_count")
+
     retweet_count: int
     reply_count: int
     like_count: int
@@ -1,6 +1,7 @@
 """
 https://developer.twitter.com/en/docs/twitter-api/tweets/search/api-reference/get-tweets-search-recent#Default
 """
+from typing import AbstractSet
 from typing import Any
 from typing import Dict
 from typing import List
@@ -13,15 +14,21 @@ from twitterapiv2.model.recent.meta import Meta
 class Recent:
     """Defines an empty search/recent object"""
 
+    __slots__ = ("data", "meta", "errors")
+
     data: List[Data]
     meta: Meta
     errors: Optional[Dict[str, Any]]
 
     @classmethod
-    def build_obj(cls, obj: Dict[str, Any]) -> "Recent":
-        """Builds object from dictionary"""
+    def build_obj(
+        cls,
+        obj: Dict[str, Any],
+        fields: Optional[AbstractSet[str]] = None,
+    ) -> "Recent":
+        """Builds object from dictionary, see `Data.build_obj` for `fields`"""
         new = cls()
         new.errors = obj.get("errors")
-        new.data = [Data.build_obj(x) for x in obj.get("data", [])]
+        new.data = [Data.build_obj(x, fields) for x in obj.get("data", [])]
         new.meta = Meta.build_obj(obj.get("meta", {}))
         return new
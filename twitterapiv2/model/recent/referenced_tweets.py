@@ -3,6 +3,8 @@ from typing import Dict
 
 
 class ReferencedTweets:
+    __slots__ = ("id", "type")
+
     id: str
     type: int
 
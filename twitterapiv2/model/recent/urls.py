@@ -3,6 +3,8 @@ from typing import Dict
 
 
 class Urls:
+    __slots__ = ("start", "end", "url", "expanded_url", "display_url", "unwound_url")
+
     start: int
     end: int
     url: str
@@ -4,6 +4,8 @@ from typing import List
 
 
 class Withheld:
+    __slots__ = ("copyright", "country_code", "scope")
+
     copyright: bool
     country_code: List[Any]
     scope: int
@@ -0,0 +1,123 @@
+"""
+Proactive rate limiter driven by the x-rate-limit-* response headers
+"""
+import logging
+import time
+from threading import Lock
+from typing import Callable
+from typing import Optional
+
+from twitterapiv2.metrics import Metrics
+from twitterapiv2.model.responseheader import ResponseHeader
+
+# Seconds to hold requests after a 429 that carried no reset header
+DEFAULT_THROTTLE_WAIT = 60
+# Seconds past the reset time to wait, covers clock drift with the server
+RESET_MARGIN = 1.0
+
+
+class RateLimiter:
+    """
+    Paces requests evenly across the current rate limit window
+
+    Call `.acquire()` before each request and `.update()` with each response
+    header. When the remaining budget runs out, callers sleep exactly until
+    the window resets. Safe to share between threads.
+
+    With `paced=False` requests are only held once the budget is exhausted.
+    Time spent holding requests is recorded as `throttle_wait_seconds` in
+    `metrics`.
+    """
+
+    def __init__(
+        self,
+        *,
+        paced: bool = True,
+        clock: Callable[[], float] = time.time,
+        sleeper: Callable[[float], None] = time.sleep,
+        metrics: Optional[Metrics] = None,
+    ) -> None:
+        self.log = logging.getLogger(__name__)
+        self.paced = paced
+        self._clock = clock
+        self._sleep = sleeper
+        self.metrics = metrics
+        self._lock = Lock()
+        self._remaining: Optional[int] = None
+        self._reset: Optional[float] = None
+        self._next_slot = 0.0
+
+    @property
+    def remaining(self) -> Optional[int]:
+        """Requests left in the window, None when unknown"""
+        return self._remaining
+
+    @property
+    def reset(self) -> Optional[float]:
+        """Epoch seconds of the window reset, None when unknown"""
+        return self._reset
+
+    def update(self, header: ResponseHeader, status: int = 200) -> None:
+        """Record the budget reported by a response"""
+        now = self._clock()
+        try:
+            reset: Optional[float] = float(header.x_rate_limit_reset)
+        except ValueError:
+            reset = None
+        with self._lock:
+            if status == 429:
+                # The server's reset is authoritative, even when it is sooner
+                self._remaining = 0
+                if reset is not None:
+                    self._reset = reset
+                elif self._reset is None or self._reset <= now:
+                    self._reset = now + DEFAULT_THROTTLE_WAIT
+                return
+            try:
+                remaining = int(header.x_rate_limit_remaining)
+            except ValueError:
+                return
+            if reset is None:
+                return
+            if self._reset is None or reset > self._reset or self._remaining is None:
+                # New window, take the server's numbers as-is
+                self._remaining = remaining
+                self._reset = reset
+            else:
+                # Same window; in-flight requests may have already reserved slots
+                self._remaining = min(self._remaining, remaining)
+
+    def acquire(self) -> None:
+        """Block until a request may be sent within the budget"""
+        now = self._clock()
+        with self._lock:
+            delay = self._reserve(now)
+        if delay > 0:
+            self.log.info("Holding request for %.1f seconds for rate limit", delay)
+            self._sleep(delay)
+        if self.metrics is not None:
+            self.metrics.observe("throttle_wait_seconds", max(delay, 0.0))
+
+    def _reserve(self, now: float) -> float:
+        """Reserve the next request slot, returns seconds to wait for it"""
+        if self._reset is None or self._remaining is None:
+            return 0.0
+
+        if now >= self._reset + RESET_MARGIN:
+            # Window has rolled over; budget is unknown until the next response
+            self._remaining = None
+            self._reset = None
+            self._next_slot = now
+            return 0.0
+
+        if self._remaining <= 0:
+            self._next_slot = self._reset + RESET_MARGIN
+            return self._next_slot - now
+
+        self._remaining -= 1
+        if not self.paced:
+            return 0.0
+
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + (self._reset - slot) / (self._remaining + 1)
+        return slot - now
@@ -1,12 +1,18 @@
 import os
+import time
 from datetime import datetime
 from typing import Any
 from typing import Dict
+from typing import FrozenSet
 from typing import Optional
 from typing import Union
 
+from twitterapiv2.archive import Archive
 from twitterapiv2.http import Http
+from twitterapiv2.http import Pool
+from twitterapiv2.metrics import Metrics
 from twitterapiv2.model.recent.recent import Recent as SearchResponse
+from twitterapiv2.rate_limiter import RateLimiter
 
 _BEARER_TOKEN = "TW_BEARER_TOKEN"
 
@@ -15,16 +21,36 @@ class SearchClient(Http):
 
     URL = "https://api.twitter.com/2/tweets/search/recent"
 
-    def __init__(self, num_pools: int = 10) -> None:
+    def __init__(
+        self,
+        num_pools: int = 10,
+        *,
+        pool: Optional[Pool] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        stream: bool = False,
+        metrics: Optional[Metrics] = None,
+        archive: Optional[Archive] = None,
+    ) -> None:
         """
         Create Search Recent client. Use methods to build query a .search() to run
 
         The environment variable "TW_BEARER_TOKEN" is required; set with the
         applicaton bearer token. This can be set manually or loaded with the
         use of AuthClient.set_bearer_token().
+
+        Clients returned by the builder methods share this client's pool, rate
+        limiter, stream setting, metrics and archive.
         """
-        super().__init__(num_pools=num_pools)
+        super().__init__(
+            num_pools=num_pools,
+            pool=pool,
+            rate_limiter=rate_limiter,
+            stream=stream,
+            metrics=metrics,
+            archive=archive,
+        )
         self._fields: Dict[str, Any] = {}
+        self._project = False
         self._next_token: Optional[str] = None
         self._previous_token: Optional[str] = None
 
@@ -135,6 +161,23 @@ class SearchClient(Http):
         self._fields["max_results"] = max_results if max_results else None
         return self._new_client()
 
+    def project(self, enabled: bool = True) -> "SearchClient":
+        """
+        Build responses with only the fields requested through `.tweet_fields()`
+
+        Attributes that were not requested read as `None` on each `Data` object
+        """
+        self._project = enabled
+        return self._new_client()
+
+    @property
+    def projection(self) -> Optional[FrozenSet[str]]:
+        """Tweet fields handed to the response builder, `None` when not projected"""
+        if not self._project:
+            return None
+        requested = self._fields.get("tweet.fields") or ""
+        return frozenset(field for field in requested.split(",") if field)
+
     def search(
         self,
         query: str,
@@ -150,9 +193,11 @@ class SearchClient(Http):
         """
         self._fields["query"] = query
         self._fields["next_token"] = page_token
-        result = SearchResponse.build_obj(
-            super().get(self.URL, self.fields, self._headers())
-        )
+        content = super().get(self.URL, self.fields, self._headers())
+        start = time.perf_counter()
+        result = SearchResponse.build_obj(content, self.projection)
+        if self.metrics is not None:
+            self.metrics.observe("parse_seconds", time.perf_counter() - start)
         self._next_token = result.meta.next_token
         self._previous_token = result.meta.previous_token
         return result
@@ -163,8 +208,15 @@ class SearchClient(Http):
 
     def _new_client(self) -> "SearchClient":
         """Used to create a new client with attributes carried forward"""
-        new_client = SearchClient()
+        new_client = SearchClient(
+            pool=self.http,
+            rate_limiter=self.rate_limiter,
+            stream=self.stream,
+            metrics=self.metrics,
+            archive=self.archive,
+        )
         new_client._fields.update(self._fields)
+        new_client._project = self._project
         return new_client
 
     @staticmethod
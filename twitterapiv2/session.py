@@ -0,0 +1,67 @@
+"""
+Session owning a single connection pool shared by many clients
+"""
+from typing import Callable
+from typing import Optional
+
+import urllib3
+
+from twitterapiv2.archive import Archive
+from twitterapiv2.auth_client import AuthClient
+from twitterapiv2.http import Http
+from twitterapiv2.http import Pool
+from twitterapiv2.metrics import Metrics
+from twitterapiv2.rate_limiter import RateLimiter
+from twitterapiv2.search_client import SearchClient
+
+# Wraps the session's PoolManager, e.g. `partial(RecordingTransport, cassette)`
+TransportFactory = Callable[[urllib3.PoolManager], Pool]
+
+
+class Session(Http):
+    """
+    Owns one urllib3 PoolManager. Clients created from a session, and the
+    clients returned by their builder methods, reuse its keep-alive connections.
+
+    `maxsize` is the number of connections kept per host. Raise it to the
+    number of threads sharing the session. A `rate_limiter` given here is
+    shared by every SearchClient of the session, as are the `stream` setting,
+    `metrics` and `archive`.
+
+    A `transport` factory is called with the new pool and its result is used
+    in place of it, see twitterapiv2.transport for record and replay.
+    """
+
+    def __init__(
+        self,
+        num_pools: int = 10,
+        maxsize: int = 1,
+        rate_limiter: Optional[RateLimiter] = None,
+        stream: bool = False,
+        transport: Optional[TransportFactory] = None,
+        metrics: Optional[Metrics] = None,
+        archive: Optional[Archive] = None,
+    ) -> None:
+        manager = self.connection(num_pools, maxsize)
+        pool = transport(manager) if transport is not None else manager
+        super().__init__(
+            pool=pool,
+            rate_limiter=rate_limiter,
+            stream=stream,
+            metrics=metrics,
+            archive=archive,
+        )
+
+    def search_client(self) -> SearchClient:
+        """Create a SearchClient bound to this session's pool and rate limiter"""
+        return SearchClient(
+            pool=self.http,
+            rate_limiter=self.rate_limiter,
+            stream=self.stream,
+            metrics=self.metrics,
+            archive=self.archive,
+        )
+
+    def auth_client(self) -> AuthClient:
+        """Create an AuthClient bound to this session's pool"""
+        return AuthClient(pool=self.http)
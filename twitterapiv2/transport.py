@@ -0,0 +1,310 @@
+"""
+Record and replay transports for offline, reproducible runs of the clients
+
+A transport stands in for the urllib3 PoolManager of an Http client. Requests
+made through a RecordingTransport are sent as usual and each response, headers
+included, is appended to a cassette. A ReplayTransport serves those responses
+back from the cassette without touching the network.
+"""
+import gzip
+import json
+import re
+import time
+from collections import deque
+from datetime import datetime
+from datetime import timezone
+from pathlib import Path
+from threading import Lock
+from typing import Any
+from typing import Callable
+from typing import Deque
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import Union
+from urllib.parse import parse_qsl
+from urllib.parse import urlencode
+from urllib.parse import urlsplit
+
+import urllib3
+
+from twitterapiv2.exceptions import CassetteMissError
+
+# Response body values replaced before they are written to a cassette
+_REDACT = re.compile(rb'("access_token"\s*:\s*)"[^"]*"')
+# Query fields holding times that the client computes at run time
+_TIME_FIELDS = frozenset(("start_time", "end_time"))
+
+
+class CassetteResponse:
+    """Recorded response, provides the parts of HTTPResponse that Http reads"""
+
+    def __init__(
+        self,
+        status: int,
+        headers: Dict[str, str],
+        data: bytes,
+        elapsed: float = 0.0,
+    ) -> None:
+        self.status = status
+        self.headers = {key.lower(): value for key, value in headers.items()}
+        self.data = data
+        self.elapsed = elapsed
+
+    def getheader(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        return self.headers.get(name.lower(), default)
+
+    def read(self) -> bytes:
+        return self.data
+
+    def release_conn(self) -> None:
+        ...
+
+
+class Cassette:
+    """
+    Gzip compressed file of recorded responses, one JSON object per line
+
+    Entries are appended as they are recorded, so an interrupted recording
+    still replays up to its last response.
+    """
+
+    def __init__(self, filename: str) -> None:
+        self.filename = filename
+        self._lock = Lock()
+
+    def load(self) -> List[Dict[str, Any]]:
+        """All recorded entries in the order they were recorded"""
+        if not Path(self.filename).exists():
+            return []
+        with gzip.open(self.filename, "rt", encoding="utf-8") as infile:
+            return [json.loads(line) for line in infile if line.strip()]
+
+    def append(self, method: str, url: str, resp: CassetteResponse) -> None:
+        """Add a response to the end of the cassette"""
+        entry = {
+            "method": method,
+            "url": url,
+            "status": resp.status,
+            "headers": resp.headers,
+            "body": resp.data.decode("utf-8", "surrogateescape"),
+            "elapsed": round(resp.elapsed, 6),
+        }
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        with self._lock:
+            # Each append is its own gzip member; gzip reads them back as one
+            with gzip.open(self.filename, "at", encoding="utf-8") as outfile:
+                outfile.write(line)
+
+
+class Transport:
+    """
+    Base for transports, provides the request methods the clients call
+
+    Fields are always encoded into the url, as urllib3 does for GET, before
+    the request is handed to `.urlopen()`. `pools` mirrors PoolManager for
+    connection stats.
+    """
+
+    @property
+    def pools(self) -> Dict[Any, Any]:
+        return {}
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        fields: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        **kw: Any,
+    ) -> Any:
+        return self.request_encode_url(method, url, fields, headers, **kw)
+
+    def request_encode_url(
+        self,
+        method: str,
+        url: str,
+        fields: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        **kw: Any,
+    ) -> Any:
+        if fields:
+            url += "?" + urlencode(fields)
+        return self.urlopen(method, url, headers=headers, **kw)
+
+    def urlopen(
+        self,
+        method: str,
+        url: str,
+        body: Any = None,
+        headers: Optional[Dict[str, str]] = None,
+        **kw: Any,
+    ) -> Any:
+        raise NotImplementedError
+
+
+class RecordingTransport(Transport):
+    """Sends requests through `pool` and records every response to `cassette`"""
+
+    def __init__(
+        self,
+        cassette: Cassette,
+        pool: Union[urllib3.PoolManager, Transport],
+    ) -> None:
+        self.cassette = cassette
+        self.pool = pool
+
+    @property
+    def pools(self) -> Any:
+        return self.pool.pools
+
+    def urlopen(
+        self,
+        method: str,
+        url: str,
+        body: Any = None,
+        headers: Optional[Dict[str, str]] = None,
+        **kw: Any,
+    ) -> Any:
+        # The body is read here to be recorded, so nothing is left to stream
+        kw["preload_content"] = True
+        start = time.perf_counter()
+        resp = self.pool.urlopen(method, url, body=body, headers=headers, **kw)
+        recorded = CassetteResponse(
+            status=resp.status,
+            headers=dict(resp.headers),
+            data=_REDACT.sub(rb'\1"REDACTED"', resp.data),
+            elapsed=time.perf_counter() - start,
+        )
+        self.cassette.append(method, url, recorded)
+        # The caller gets the real body, only the cassette is redacted
+        return CassetteResponse(recorded.status, recorded.headers, resp.data)
+
+
+class ReplayTransport(Transport):
+    """
+    Serves responses from `cassette` in the order they were recorded
+
+    A request is matched on method and full url first. When nothing matches,
+    as happens when a query holds a time computed at run time, an unused
+    response recorded for the same path is served: one whose other fields
+    match if any, then the one with the nearest start_time and end_time. Each
+    shard of a sharded run is therefore given its own window's responses,
+    whatever order its threads run in.
+
+    With `realtime` each response is held for its recorded latency.
+
+    Raises:
+        CassetteMissError - No recorded response is left for the request
+    """
+
+    def __init__(
+        self,
+        cassette: Cassette,
+        *,
+        realtime: bool = False,
+        sleeper: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.realtime = realtime
+        self._sleep = sleeper
+        self._lock = Lock()
+        self._entries = cassette.load()
+        self._used = [False] * len(self._entries)
+        self._shapes = [_shape(entry["url"]) for entry in self._entries]
+        self._times = [_times(entry["url"]) for entry in self._entries]
+        self._by_url: Dict[Tuple[str, str], Deque[int]] = {}
+        self._by_path: Dict[Tuple[str, str], List[int]] = {}
+        for idx, entry in enumerate(self._entries):
+            method = entry["method"]
+            self._by_url.setdefault((method, entry["url"]), deque()).append(idx)
+            self._by_path.setdefault((method, _path(entry["url"])), []).append(idx)
+
+    @property
+    def remaining(self) -> int:
+        """Number of recorded responses not yet replayed"""
+        return self._used.count(False)
+
+    def urlopen(
+        self,
+        method: str,
+        url: str,
+        body: Any = None,
+        headers: Optional[Dict[str, str]] = None,
+        **kw: Any,
+    ) -> Any:
+        with self._lock:
+            idx = self._next(self._by_url.get((method, url)))
+            if idx is None:
+                idx = self._nearest(method, url)
+            if idx is None:
+                raise CassetteMissError(f"No recorded response for {method} {url}")
+            self._used[idx] = True
+        entry = self._entries[idx]
+        if self.realtime and entry["elapsed"] > 0:
+            self._sleep(entry["elapsed"])
+        return CassetteResponse(
+            status=entry["status"],
+            headers=entry["headers"],
+            data=entry["body"].encode("utf-8", "surrogateescape"),
+            elapsed=entry["elapsed"],
+        )
+
+    def _next(self, queue: Optional[Deque[int]]) -> Optional[int]:
+        """Pop the first unused entry index from `queue`"""
+        while queue:
+            idx = queue.popleft()
+            if not self._used[idx]:
+                return idx
+        return None
+
+    def _nearest(self, method: str, url: str) -> Optional[int]:
+        """
+        Unused entry for the path of `url`, preferring the same fields apart
+        from times, then the nearest times, then the earliest recorded
+        """
+        shape, wanted = _shape(url), _times(url)
+        candidates = [
+            idx
+            for idx in self._by_path.get((method, _path(url)), [])
+            if not self._used[idx]
+        ]
+        if not candidates:
+            return None
+
+        def distance(idx: int) -> Tuple[bool, float, int]:
+            recorded = self._times[idx]
+            shared = wanted.keys() & recorded.keys()
+            gap = sum(abs(wanted[key] - recorded[key]) for key in shared)
+            return self._shapes[idx] != shape, gap, idx
+
+        return min(candidates, key=distance)
+
+
+def _path(url: str) -> str:
+    """Url without its query string"""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}{parts.path}"
+
+
+def _shape(url: str) -> str:
+    """Url with its time fields removed and the other fields sorted"""
+    parts = urlsplit(url)
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query) if key not in _TIME_FIELDS
+    )
+    return f"{_path(url)}?{urlencode(query)}"
+
+
+def _times(url: str) -> Dict[str, float]:
+    """Epoch seconds of the time fields of `url` that parse as API times"""
+    times = {}
+    for key, value in parse_qsl(urlsplit(url).query):
+        if key not in _TIME_FIELDS:
+            continue
+        try:
+            parsed = datetime.strptime(value, "%Y-%m-%dT%H:%M:%SZ")
+        except ValueError:
+            continue
+        times[key] = parsed.replace(tzinfo=timezone.utc).timestamp()
+    return times
@@ -9,7 +9,6 @@ Coded by: Preocts
 """
 
 import re
-import sys
 import json
 import string
 import logging
@@ -19,6 +18,9 @@ import argparse
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
+CHUNK_SIZE = 1 << 16  # Characters read from the input file at a time
+UNICODE = re.compile(r'\\u[a-z|0-9]{4}')
+
 
 def isInt(n):
     try:
@@ -35,6 +37,103 @@ def noPunc(w):
     return w
 
 
+def cleanChunks(file, size: int = CHUNK_SIZE):
+    """ Yields the file in chunks of text with unicoding removed
+
+    An escape cut off at the end of a chunk is held back and cleaned with
+    the next chunk.
+    """
+    carry = ''
+    while True:
+        chunk = file.read(size)
+        if not chunk:
+            yield UNICODE.sub('', carry)
+            return
+        text = carry + chunk
+        cut = text.rfind('\\', max(len(text) - 5, 0))
+        if cut == -1:
+            cut = len(text)
+        carry = text[cut:]
+        yield UNICODE.sub('', text[:cut])
+
+
+def iterCollect(filename: str, size: int = CHUNK_SIZE):
+    """ Yields each [id, text] entry of the "collect" array in a file
+
+    The file is read in chunks and each entry is decoded on its own, so
+    memory use stays flat regardless of file size.
+    """
+    decoder = json.JSONDecoder()
+    with open(filename, 'r') as file:
+        chunks = cleanChunks(file, size)
+        buffer = ''
+        pos = -1
+        # Find the start of the collect array
+        while pos == -1:
+            chunk = next(chunks, None)
+            if chunk is None:
+                raise ValueError(f'No "collect" array found in {filename}')
+            buffer = buffer[-64:] + chunk
+            found = re.search(r'"collect"\s*:\s*\[', buffer)
+            pos = found.end() if found else -1
+
+        while True:
+            # Skip to the next entry, reading more when the buffer runs out
+            while True:
+                while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                    pos += 1
+                if pos < len(buffer):
+                    break
+                chunk = next(chunks, None)
+                if chunk is None:
+                    raise ValueError(f'Unexpected end of file in {filename}')
+                buffer, pos = chunk, 0
+            if buffer[pos] == ']':
+                return
+            try:
+                entry, pos = decoder.raw_decode(buffer, pos)
+            except ValueError:
+                # Entry continues in the next chunk
+                chunk = next(chunks, None)
+                if chunk is None:
+                    raise
+                buffer, pos = buffer[pos:] + chunk, 0
+                continue
+            yield entry
+
+
+def countWords(text: str, words: dict, hashtags: dict) -> None:
+    """ Adds the words and hashtags of a single text to the counts """
+    slice = text.replace('\n', ' ').split(' ')
+    for i, s in enumerate(slice):
+        word = noPunc(s.lower())
+
+        # Only track words > 2 and < 42 characters
+        if not(len(word) > 1 and len(word) < 42):
+            continue
+
+        # Hashtags
+        if word[0] == '#':
+            hashtags[word] = hashtags.get(word, 0) + 1
+            continue
+
+        # Ignore links
+        if word[:4] == 'http':
+            continue
+
+        # Ignore more things not starting with a ascii letter
+        if not(word.startswith(tuple(string.ascii_letters))):
+            continue
+
+        if not(word.endswith(tuple(string.ascii_letters))):
+            continue
+
+        if word in stopwords.list:
+            continue
+
+        words[word] = words.get(word, 0) + 1
+
+
 def getwords(filename: str) -> dict:
     """ Parses a collect.py output file and returns a dict
 
@@ -60,47 +159,16 @@ def getwords(filename: str) -> dict:
 
     Returns: two dicts by word/hashtag with count from provided input
     {"[word]": 0}, {"[hashtag]": 0}
-"""
-    with open(filename, 'r') as file:
-        rawread = r"{}".format(file.read())
-    logger.debug(f'Loaded file: {filename} ({sys.getsizeof(rawread)} bytes)')
-    cleanread = re.sub(r'\\u[a-z|0-9]{4}', '', rawread)  # Remove unicoding
-    jsonDict = json.loads(cleanread)
-    rawread = None
-    logger.debug(f'Cleaned input: Count: {len(jsonDict["collect"])} '
-                 f'({sys.getsizeof(jsonDict)} bytes)')
 
+    The file is streamed with iterCollect(), it is never loaded whole.
+"""
     hashtags = {}
     words = {}
-    for id, text in jsonDict['collect']:
-        slice = text.replace('\n', ' ').split(' ')
-        for i, s in enumerate(slice):
-            word = noPunc(s.lower())
-
-            # Only track words > 2 and < 42 characters
-            if not(len(word) > 1 and len(word) < 42):
-                continue
-
-            # Hashtags
-            if word[0] == '#':
-                hashtags[word] = hashtags.get(word, 0) + 1
-                continue
-
-            # Ignore links
-            if word[:4] == 'http':
-                continue
-
-            # Ignore more things not starting with a ascii letter
-            if not(word.startswith(tuple(string.ascii_letters))):
-                continue
-
-            if not(word.endswith(tuple(string.ascii_letters))):
-                continue
-
-            if word in stopwords.list:
-                continue
-
-            words[word] = words.get(word, 0) + 1
+    count = 0
+    for id, text in iterCollect(filename):
+        countWords(text, words, hashtags)
+        count += 1
+    logger.debug(f'Loaded file: {filename} (Count: {count})')
     logger.debug(f'Completed getting words. Total: {len(words)}')
     logger.debug(f'Removed hashtags. Total: {len(hashtags)}')
     return words, hashtags
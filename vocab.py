@@ -0,0 +1,158 @@
+"""
+Interned vocabulary with counts aggregated from buffers of token ids
+
+Uses NumPy for the aggregation when it is installed, falls back to the
+standard library otherwise.
+"""
+import heapq
+from array import array
+from collections import Counter
+from operator import itemgetter
+from typing import Any
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Mapping
+
+try:
+    import numpy
+except ImportError:
+    numpy = None  # type: ignore
+
+# Token ids buffered before they are aggregated into the counts
+FLUSH_SIZE = 1 << 20
+
+
+class Vocabulary(Dict[str, int]):
+    """Maps each word to a consecutive integer id, assigned on first lookup"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.words: List[str] = []
+
+    def __missing__(self, word: str) -> int:
+        idx = len(self.words)
+        self[word] = idx
+        self.words.append(word)
+        return idx
+
+
+class TokenCounts(Mapping[str, int]):
+    """
+    Word counts kept as an array indexed by vocabulary id
+
+    `.update()` only interns words and appends their ids to a compact buffer.
+    Once FLUSH_SIZE ids are waiting they are counted in one vectorized pass
+    (`numpy.bincount`, or `Counter` over the ids without NumPy).
+
+    Reads flush the buffer first and behave as a read-only `Dict[str, int]`.
+    """
+
+    def __init__(self, flush_size: int = FLUSH_SIZE) -> None:
+        self.vocabulary = Vocabulary()
+        self.flush_size = flush_size
+        self._ids = array("I")
+        self._counts: Any = numpy.zeros(0, numpy.int64) if numpy else array("q")
+
+    def __getitem__(self, word: str) -> int:
+        idx = self.vocabulary.get(word)
+        if idx is None:
+            raise KeyError(word)
+        self.flush()
+        return int(self._counts[idx])
+
+    def __iter__(self) -> Iterator[str]:
+        self.flush()
+        return iter(self.vocabulary.words)
+
+    def __len__(self) -> int:
+        return len(self.vocabulary.words)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        self.flush()
+        return self.__dict__
+
+    def update(self, words: Iterable[str]) -> None:
+        """Count an iterable of words, or add the counts of another TokenCounts"""
+        if isinstance(words, TokenCounts):
+            self._merge(words)
+            return
+        self._ids.extend(map(self.vocabulary.__getitem__, words))
+        if len(self._ids) >= self.flush_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Aggregate the buffered ids into the counts"""
+        size = len(self.vocabulary.words)
+        if not self._ids and len(self._counts) == size:
+            return
+        if numpy is not None:
+            if self._ids:
+                ids = numpy.frombuffer(self._ids, dtype=numpy.uint32)
+                self._add(numpy.bincount(ids, minlength=size))
+            else:
+                self._add(numpy.zeros(size, numpy.int64))
+        else:
+            self._counts.extend([0] * (size - len(self._counts)))
+            for idx, count in Counter(self._ids).items():
+                self._counts[idx] += count
+        self._ids = array("I")
+
+    def counts(self) -> Any:
+        """Counts indexed by vocabulary id, a NumPy array when installed"""
+        self.flush()
+        return self._counts
+
+    def as_dict(self) -> Dict[str, int]:
+        """All counts as a plain dict"""
+        counts = self.counts()
+        values = counts.tolist()
+        return dict(zip(self.vocabulary.words, values))
+
+    def above(self, percent: float) -> Dict[str, int]:
+        """Counts of at least `percent` of the highest count"""
+        counts = self.counts()
+        if not len(counts):
+            return {}
+        words = self.vocabulary.words
+        if numpy is None:
+            limit = max(counts) * percent / 100
+            return {words[i]: c for i, c in enumerate(counts) if c >= limit}
+        limit = counts.max() * percent / 100
+        keep = numpy.flatnonzero(counts >= limit)
+        return dict(zip([words[i] for i in keep], counts[keep].tolist()))
+
+    def top(self, size: int) -> Dict[str, int]:
+        """The `size` highest counts, selected without sorting every count"""
+        counts = self.counts()
+        words = self.vocabulary.words
+        if size >= len(counts):
+            return self.as_dict()
+        if numpy is None:
+            pairs = zip(words, counts)
+            return dict(heapq.nlargest(size, pairs, key=itemgetter(1)))
+        keep = numpy.argpartition(counts, len(counts) - size)[-size:]
+        return dict(zip([words[i] for i in keep], counts[keep].tolist()))
+
+    def _add(self, counts: Any) -> None:
+        """Add an id indexed numpy count array to the counts"""
+        if len(counts) > len(self._counts):
+            grown = numpy.zeros(len(counts), numpy.int64)
+            grown[: len(self._counts)] = self._counts
+            self._counts = grown
+        self._counts[: len(counts)] += counts
+
+    def _merge(self, other: "TokenCounts") -> None:
+        """Add the counts of another vocabulary, remapping its ids"""
+        other_counts = other.counts()
+        remap = array("I", map(self.vocabulary.__getitem__, other.vocabulary.words))
+        self.flush()
+        if numpy is not None:
+            ids = numpy.frombuffer(remap, dtype=numpy.uint32)
+            size = len(self.vocabulary.words)
+            merged = numpy.bincount(ids, weights=other_counts, minlength=size)
+            self._add(merged.astype(numpy.int64))
+        else:
+            for idx, count in zip(remap, other_counts):
+                self._counts[idx] += count